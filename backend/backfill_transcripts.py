@@ -0,0 +1,92 @@
+"""
+Rellena video_transcripts (formato compacto de functions/Transcripts.py)
+a partir de videos.transcript_json e informa del tamaño en disco. La tabla
+compacta se añade al JSON (que se conserva): el total crece.
+
+Uso:
+    python backfill_transcripts.py                  # todo el catálogo
+    python backfill_transcripts.py --missing-only   # solo videos sin fila compacta
+    python backfill_transcripts.py --chunk-rows 1000
+
+Lee en streaming por trozos y escribe cada trozo con un único
+INSERT ... ON CONFLICT (video_id) DO UPDATE multi-fila.
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from database import AsyncSessionLocal, engine
+from models.video import Video, VideoTranscript
+from functions.Writer import upsert_transcripts
+import cache
+
+DEFAULT_CHUNK_ROWS = 500
+
+# Tamaño almacenado (tras TOAST) de cada representación
+SIZES_QUERY = text("""
+    SELECT
+        (SELECT count(*) FROM videos) AS videos,
+        (SELECT coalesce(sum(pg_column_size(transcript_json)), 0) FROM videos) AS json_bytes,
+        (SELECT count(*) FROM video_transcripts) AS compact_rows,
+        (SELECT coalesce(sum(pg_column_size(starts) + pg_column_size(texts)), 0) FROM video_transcripts) AS compact_bytes
+""")
+
+
+async def write_chunk(items: list[tuple[str, list]]):
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await upsert_transcripts(session, items)
+    await cache.invalidate_videos([vid for vid, _ in items])
+
+
+async def report_sizes():
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(SIZES_QUERY)).one()
+    growth = row.compact_bytes / row.json_bytes if row.json_bytes else 0
+    print(f"📦 transcript_json: {row.json_bytes / 1024:,.1f} KB en {row.videos} videos")
+    print(f"📦 video_transcripts: {row.compact_bytes / 1024:,.1f} KB en {row.compact_rows} filas")
+    print(f"📦 Total transcripciones: {(row.json_bytes + row.compact_bytes) / 1024:,.1f} KB (+{growth:.0%} sobre solo JSON)")
+
+
+async def run(args):
+    start = time.time()
+    written = 0
+
+    query = select(Video.video_id, Video.transcript_json).order_by(Video.video_id)
+    if args.missing_only:
+        query = query.where(~select(VideoTranscript.video_id)
+                            .where(VideoTranscript.video_id == Video.video_id).exists())
+
+    async with AsyncSessionLocal() as reader:
+        result = await reader.stream(query.execution_options(yield_per=args.chunk_rows))
+        async for rows in result.partitions():
+            await write_chunk([(r.video_id, r.transcript_json) for r in rows])
+            written += len(rows)
+            print(f"📜 {written} transcripciones | {written / (time.time() - start):,.0f} videos/s")
+
+    print(f"✅ {written} transcripciones compactadas en {time.time() - start:.1f}s.")
+    await report_sizes()
+
+
+async def main_async(args):
+    try:
+        connection = cache.connect()
+        await connection.ping()
+        await cache.init_cache(connection)
+    except Exception as e:
+        print(f"⚠️ Redis no disponible, la API servirá caché hasta su TTL: {e}")
+    await run(args)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--missing-only", action="store_true", help="Solo videos sin fila en video_transcripts")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark de payloads: cuánto ahorran la compresión negociada y el 304
+(If-None-Match) en GET /videos/{id} y GET /videos/, con filas reales del
+volcado db/data-*.csv. No necesita base de datos ni servidor.
+
+Uso: python bench_payloads.py [ruta_csv] [--mbps 10]
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import statistics
+import time
+
+from functions.Dump import parse_dump_row
+from compression import ENCODERS, compress_bytes
+
+SUMMARY_FIELDS = [
+    "video_id", "url", "title", "channel_name", "topics", "accents", "content_types",
+    "level", "wpm", "language", "subtitle_source", "created_at", "updated_at",
+]
+DETAIL_FIELDS = SUMMARY_FIELDS + ["transcript_json", "ai_analysis"]
+
+
+def load_rows(path: str) -> list[dict]:
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for raw in csv.DictReader(f):
+            row = parse_dump_row(raw)
+            for col in ("created_at", "updated_at"):
+                row[col] = row[col].isoformat() if row[col] else None
+            rows.append(row)
+    return rows
+
+
+def timed(fn, repeat: int = 5) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples), result
+
+
+def report(label: str, payloads: list[bytes], mbps: float):
+    wire = lambda n: n * 8 / (mbps * 1_000_000)
+    raw_total = sum(len(p) for p in payloads)
+    print(f"\n=== {label}: {len(payloads)} respuestas, {raw_total / 1024:.1f} KB sin comprimir ===")
+    print(f"{'codificación':<14}{'KB':>10}{'ratio':>8}{'comprimir ms':>15}{'red ms':>10}{'total ms':>10}")
+    base_ms = wire(raw_total) * 1000
+    print(f"{'identity':<14}{raw_total / 1024:>10.1f}{1.0:>8.2f}{0.0:>15.2f}{base_ms:>10.1f}{base_ms:>10.1f}")
+    for name in ENCODERS:
+        cpu, size = 0.0, 0
+        for payload in payloads:
+            t, compressed = timed(lambda: compress_bytes(payload, name))
+            cpu += t
+            size += len(compressed)
+        net_ms = wire(size) * 1000
+        print(f"{name:<14}{size / 1024:>10.1f}{raw_total / size:>8.2f}{cpu * 1000:>15.2f}{net_ms:>10.1f}{cpu * 1000 + net_ms:>10.1f}")
+    # Revalidación con ETag vigente: solo cabeceras, cuerpo vacío
+    print(f"{'304 (ETag)':<14}{0.0:>10.1f}{'∞':>8}{0.0:>15.2f}{0.0:>10.1f}{0.0:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_csv = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "db", "data-*.csv")))
+    parser.add_argument("csv_path", nargs="?", default=default_csv[-1] if default_csv else None)
+    parser.add_argument("--mbps", type=float, default=10.0, help="Ancho de banda simulado del cliente")
+    args = parser.parse_args()
+    if not args.csv_path:
+        parser.error("No se encontró ningún db/data-*.csv")
+
+    rows = load_rows(args.csv_path)
+    print(f"📂 {len(rows)} filas de {os.path.basename(args.csv_path)} | {args.mbps} Mbps | codificaciones: {', '.join(ENCODERS)}")
+
+    detail = [json.dumps({f: r.get(f) for f in DETAIL_FIELDS}).encode("utf-8") for r in rows]
+    report("GET /videos/{id}", detail, args.mbps)
+
+    list_full = json.dumps([{f: r.get(f) for f in DETAIL_FIELDS} for r in rows]).encode("utf-8")
+    report("GET /videos/?view=full (una página)", [list_full], args.mbps)
+
+    list_summary = json.dumps([{f: r.get(f) for f in SUMMARY_FIELDS} for r in rows]).encode("utf-8")
+    report("GET /videos/ (resumen, una página)", [list_summary], args.mbps)
+
+
+if __name__ == "__main__":
+    main()
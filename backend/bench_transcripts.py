@@ -0,0 +1,120 @@
+"""
+Benchmark de la transcripción compacta (functions/Transcripts.py) frente al
+array JSON de transcript_json, con filas reales del volcado db/data-*.csv.
+No necesita base de datos ni servidor.
+
+Mide:
+  - almacenamiento: el formato compacto se guarda ADEMÁS de transcript_json
+    (búsqueda, export y recompute_rates siguen leyendo el JSON), así que el
+    total por fila crece; se informa el total junto al tamaño de cada forma
+  - codificar / decodificar una transcripción completa y una ventana
+  - detalle: GET /videos/{id} completo vs ?transcript=false + una ventana de reproductor
+
+Uso: python bench_transcripts.py [ruta_csv] [--window 60]
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import statistics
+import time
+import zlib
+
+from functions.Dump import parse_dump_row
+from functions.Transcripts import ZLIB_LEVEL, decode_segments, encode_segments
+
+DETAIL_FIELDS = [
+    "video_id", "url", "title", "channel_name", "topics", "accents", "content_types",
+    "level", "wpm", "language", "subtitle_source", "created_at", "updated_at",
+    "transcript_json", "ai_analysis",
+]
+
+
+def load_rows(path: str) -> list[dict]:
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for raw in csv.DictReader(f):
+            row = parse_dump_row(raw)
+            for col in ("created_at", "updated_at"):
+                row[col] = row[col].isoformat() if row[col] else None
+            rows.append(row)
+    return rows
+
+
+def timed(fn, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_csv = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "db", "data-*.csv")))
+    parser.add_argument("csv_path", nargs="?", default=default_csv[-1] if default_csv else None)
+    parser.add_argument("--window", type=float, default=60.0, help="Segundos por ventana del reproductor")
+    args = parser.parse_args()
+    if not args.csv_path:
+        parser.error("No se encontró ningún db/data-*.csv")
+
+    rows = [r for r in load_rows(args.csv_path) if isinstance(r.get("transcript_json"), list)]
+    print(f"📂 {len(rows)} transcripciones de {os.path.basename(args.csv_path)} | ventana {args.window:.0f}s")
+
+    # --- Almacenamiento ---
+    json_blobs = [json.dumps(r["transcript_json"], ensure_ascii=False).encode("utf-8") for r in rows]
+    encoded = [encode_segments(r["transcript_json"]) for r in rows]
+    json_kb = sum(len(b) for b in json_blobs) / 1024
+    zjson_kb = sum(len(zlib.compress(b, ZLIB_LEVEL)) for b in json_blobs) / 1024
+    compact_kb = sum(len(e["starts"]) + len(e["texts"]) for e in encoded) / 1024
+    print("\n=== Almacenamiento (bytes antes de la compresión TOAST de Postgres) ===")
+    print(f"{'forma':<34}{'KB':>10}{'vs JSON':>9}")
+    for label, kb in (
+        ("transcript_json (antes)", json_kb),
+        ("JSON + zlib (referencia)", zjson_kb),
+        ("video_transcripts sola", compact_kb),
+        ("total: JSON + video_transcripts", json_kb + compact_kb),
+    ):
+        print(f"{label:<34}{kb:>10.1f}{kb / json_kb:>8.2f}x")
+    print(f"⚠️ El almacenamiento total crece un {compact_kb / json_kb:.0%}: la tabla compacta "
+          f"acelera las ventanas del reproductor, no ahorra disco.")
+
+    # --- CPU de codificar / decodificar ---
+    enc_ms = timed(lambda: [encode_segments(r["transcript_json"]) for r in rows]) * 1000
+    dec_ms = timed(lambda: [decode_segments(e["starts"], e["texts"]) for e in encoded]) * 1000
+    win_ms = timed(lambda: [decode_segments(e["starts"], e["texts"], 0, args.window) for e in encoded]) * 1000
+    parse_ms = timed(lambda: [json.loads(b) for b in json_blobs]) * 1000
+    print("\n=== CPU (total del volcado) ===")
+    print(f"{'json.loads transcript_json':<34}{parse_ms:>10.2f} ms")
+    print(f"{'encode_segments':<34}{enc_ms:>10.2f} ms")
+    print(f"{'decode_segments (completo)':<34}{dec_ms:>10.2f} ms")
+    print(f"{'decode_segments (ventana)':<34}{win_ms:>10.2f} ms")
+
+    # --- Detalle: completo vs lite + primera ventana ---
+    def full_detail():
+        return [json.dumps({f: r.get(f) for f in DETAIL_FIELDS}, ensure_ascii=False).encode("utf-8") for r in rows]
+
+    def lite_plus_window():
+        out = []
+        for r, e in zip(rows, encoded):
+            lite = json.dumps({f: r.get(f) for f in DETAIL_FIELDS if f != "transcript_json"}, ensure_ascii=False)
+            window = json.dumps({"video_id": r["video_id"], "segments": decode_segments(e["starts"], e["texts"], 0, args.window)},
+                                ensure_ascii=False)
+            out.append((lite + window).encode("utf-8"))
+        return out
+
+    full_kb = sum(len(b) for b in full_detail()) / 1024
+    lite_kb = sum(len(b) for b in lite_plus_window()) / 1024
+    full_ms = timed(full_detail) * 1000
+    lite_ms = timed(lite_plus_window) * 1000
+    n = len(rows)
+    print("\n=== Página de detalle (por video) ===")
+    print(f"{'respuesta':<34}{'KB':>8}{'serializar ms':>15}")
+    print(f"{'GET /videos/{id}':<34}{full_kb / n:>8.1f}{full_ms / n:>15.3f}")
+    print(f"{'?transcript=false + /transcript':<34}{lite_kb / n:>8.1f}{lite_ms / n:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+import redis.asyncio as redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# ⚡ CACHÉ DE LECTURAS DEL CATÁLOGO (REDIS)
+# ==========================================
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+CACHE_PREFIX = "ac602:cache"
+DETAIL_TTL = int(os.getenv("CACHE_DETAIL_TTL", "3600"))     # 1 h: el detalle casi no cambia
+LIST_TTL = int(os.getenv("CACHE_LIST_TTL", "300"))          # 5 min: listados
+MAX_ENTRY_BYTES = int(os.getenv("CACHE_MAX_ENTRY_BYTES", str(2 * 1024 * 1024)))
+# Instancia (o DB) propia para la caché, ej: redis://localhost:6380/0.
+# Vacío = misma conexión que el rate limiter, sin tocar la config del servidor:
+# una política de expulsión global también podría borrar los contadores de
+# fastapi-limiter (tienen TTL) y desactivar el límite sin avisar.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+# Límite de memoria (ej: "256mb"). Solo se aplica a una instancia dedicada
+# (maxmemory es de todo el servidor, no de una DB). Vacío = no tocar la config.
+CACHE_MAXMEMORY = os.getenv("CACHE_MAXMEMORY", "")
+# En una instancia dedicada todo es caché: se expulsa cualquier clave por LRU.
+CACHE_EVICTION_POLICY = os.getenv("CACHE_EVICTION_POLICY", "allkeys-lru")
+
+STATS_KEY = f"{CACHE_PREFIX}:stats"
+LIST_GEN_KEY = f"{CACHE_PREFIX}:list_gen"
+
+redis_client: Optional[redis.Redis] = None
+
+
+def connect() -> redis.Redis:
+    return redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+
+
+async def init_cache(connection: redis.Redis):
+    """
+    Registra la conexión de la caché: la compartida (la del rate limiter) o,
+    con CACHE_REDIS_URL, una propia a la que sí se le acota la memoria.
+    """
+    global redis_client
+    if not CACHE_REDIS_URL:
+        redis_client = connection
+        if CACHE_MAXMEMORY:
+            print("⚠️ CACHE_MAXMEMORY se ignora sin CACHE_REDIS_URL: Redis es compartido con el rate limiter.")
+        return
+
+    redis_client = redis.from_url(CACHE_REDIS_URL, encoding="utf-8", decode_responses=True)
+    if CACHE_MAXMEMORY:
+        try:
+            await redis_client.config_set("maxmemory", CACHE_MAXMEMORY)
+            await redis_client.config_set("maxmemory-policy", CACHE_EVICTION_POLICY)
+            print(f"🧠 Caché limitada a {CACHE_MAXMEMORY} ({CACHE_EVICTION_POLICY}).")
+        except Exception as e:
+            # Redis gestionado (CONFIG deshabilitado): seguimos con sus límites
+            print(f"⚠️ No se pudo configurar maxmemory en Redis: {e}")
+
+
+async def close_cache():
+    """Cierra la conexión propia de la caché (la compartida la cierra quien la abrió)."""
+    global redis_client
+    if CACHE_REDIS_URL and redis_client is not None:
+        await redis_client.close()
+    redis_client = None
+
+
+def detail_key(video_id: str, lite: bool = False) -> str:
+    # lite: detalle sin transcript_json (el reproductor pide ventanas aparte)
+    return f"{CACHE_PREFIX}:video:{video_id}" + (":lite" if lite else "")
+
+
+async def list_key(params: dict) -> str:
+    """
+    Clave normalizada para un listado: ignora parámetros vacíos y el orden en
+    que llegan. Incluye la generación actual, que se incrementa con cada
+    escritura para invalidar todos los listados de golpe.
+    """
+    normalized = {k: v for k, v in sorted(params.items()) if v not in (None, "")}
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    generation = 0
+    if redis_client is not None:
+        try:
+            generation = int(await redis_client.get(LIST_GEN_KEY) or 0)
+        except Exception:
+            pass
+    return f"{CACHE_PREFIX}:list:{generation}:{digest}"
+
+
+async def get_cached(key: str, kind: str) -> Optional[dict]:
+    """Devuelve la entrada (hash de Redis) o None. Cuenta aciertos y fallos por tipo."""
+    if redis_client is None:
+        return None
+    try:
+        entry = await redis_client.hgetall(key)
+        await redis_client.hincrby(STATS_KEY, f"{kind}_{'hits' if entry else 'misses'}", 1)
+        return entry or None
+    except Exception as e:
+        print(f"⚠️ Caché no disponible (lectura): {e}")
+        return None
+
+
+async def set_cached(key: str, entry: dict, ttl: int):
+    if redis_client is None:
+        return
+    if sum(len(str(v)) for v in entry.values()) > MAX_ENTRY_BYTES:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=entry)
+            pipe.expire(key, ttl)
+            await pipe.execute()
+    except Exception as e:
+        print(f"⚠️ Caché no disponible (escritura): {e}")
+
+
+async def invalidate_videos(video_ids: list[str]):
+    """
+    Borra el detalle de los videos escritos y pasa a una nueva generación de
+    listados (las antiguas caducan solas por TTL).
+    """
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            if video_ids:
+                pipe.delete(*[detail_key(v, lite) for v in video_ids for lite in (False, True)])
+            pipe.incr(LIST_GEN_KEY)
+            await pipe.execute()
+    except Exception as e:
+        print(f"⚠️ No se pudo invalidar la caché: {e}")
+
+
+async def cache_stats() -> dict:
+    if redis_client is None:
+        return {"enabled": False}
+    try:
+        raw = await redis_client.hgetall(STATS_KEY)
+    except Exception as e:
+        print(f"⚠️ Caché no disponible (estadísticas): {e}")
+        return {"enabled": True, "available": False}
+    stats = {"enabled": True, "available": True, "dedicated": bool(CACHE_REDIS_URL)}
+    for kind in ("detail", "list"):
+        hits = int(raw.get(f"{kind}_hits", 0))
+        misses = int(raw.get(f"{kind}_misses", 0))
+        total = hits + misses
+        stats[kind] = {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 4) if total else 0.0}
+    try:
+        memory = await redis_client.info("memory")
+        stats["used_memory"] = memory.get("used_memory_human")
+        stats["maxmemory"] = memory.get("maxmemory_human")
+    except Exception:
+        pass
+    return stats
@@ -0,0 +1,90 @@
+"""
+Acuerdo entre el análisis local (functions/LocalAnalysis.py) y el nivel CEFR
+que puso el LLM en el volcado db/data-*.csv. No necesita base de datos.
+
+Uso:
+  python check_local_analysis.py [ruta_csv]
+  python check_local_analysis.py --build-freq [--words 60000]
+      (genera Data/word_zipf.json con wordfreq para máquinas sin wordfreq)
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from collections import Counter
+
+from functions.Dump import parse_dump_row
+from functions import LocalAnalysis
+from functions.LocalAnalysis import CEFR_LEVELS, WORD_ZIPF_PATH, analyze_transcript
+
+
+def build_freq(words: int):
+    try:
+        from wordfreq import top_n_list, zipf_frequency
+    except ImportError:
+        raise SystemExit("❌ --build-freq necesita wordfreq instalado (pip install wordfreq).")
+    table = {w: zipf_frequency(w, "en") for w in top_n_list("en", words)}
+    os.makedirs(os.path.dirname(WORD_ZIPF_PATH) or ".", exist_ok=True)
+    with open(WORD_ZIPF_PATH, "w", encoding="utf-8") as f:
+        json.dump(table, f, separators=(",", ":"))
+    print(f"✅ {len(table)} palabras -> {WORD_ZIPF_PATH}")
+
+
+def check(path: str):
+    if not LocalAnalysis.zipf_lookup.available:
+        raise SystemExit(f"❌ Sin frecuencias: instala wordfreq o genera {WORD_ZIPF_PATH} con --build-freq.")
+
+    exact = near = clear = clear_exact = total = 0
+    confusion, wpm_diffs, elapsed = Counter(), [], 0.0
+    with open(path, newline="", encoding="utf-8") as f:
+        for raw in csv.DictReader(f):
+            row = parse_dump_row(raw)
+            if row["level"] not in CEFR_LEVELS or not row["transcript_json"]:
+                continue
+            text = " ".join(seg.get("text", "") for seg in row["transcript_json"])
+            t0 = time.perf_counter()
+            local = analyze_transcript(text, row["wpm"])
+            elapsed += time.perf_counter() - t0
+            if not local:
+                continue
+            total += 1
+            llm, est = row["level"], local["cefr_estimate"]
+            confusion[(llm, est)] += 1
+            exact += llm == est
+            near += abs(CEFR_LEVELS.index(llm) - CEFR_LEVELS.index(est)) <= 1
+            if local["clear"]:
+                clear += 1
+                clear_exact += llm == est
+            llm_wpm = (row["ai_analysis"] or {}).get("wpm_estimate")
+            if isinstance(llm_wpm, (int, float)) and row["wpm"]:
+                wpm_diffs.append(abs(llm_wpm - row["wpm"]))
+
+    if not total:
+        raise SystemExit("⚠️ Ninguna fila con nivel y transcripción.")
+    print(f"\n=== Análisis local vs LLM: {total} videos ({elapsed / total * 1000:.1f} ms/video) ===")
+    print(f"CEFR exacto:     {exact / total:.0%}")
+    print(f"CEFR ±1 nivel:   {near / total:.0%}")
+    print(f"Claros:          {clear}/{total} (exacto {clear_exact / clear:.0%})" if clear else f"Claros:          0/{total}")
+    if wpm_diffs:
+        print(f"wpm |LLM - local| medio: {sum(wpm_diffs) / len(wpm_diffs):.0f}")
+    print("\nLLM -> local: " + ", ".join(f"{a}->{b}: {n}" for (a, b), n in sorted(confusion.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="?", help="Volcado CSV (por defecto ../db/data-*.csv)")
+    parser.add_argument("--build-freq", action="store_true", help="Genera Data/word_zipf.json con wordfreq")
+    parser.add_argument("--words", type=int, default=60000)
+    args = parser.parse_args()
+
+    if args.build_freq:
+        build_freq(args.words)
+        return
+    path = args.csv or sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "db", "data-*.csv")))[-1]
+    check(path)
+
+
+if __name__ == "__main__":
+    main()
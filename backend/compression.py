@@ -0,0 +1,246 @@
+import os
+import zlib
+
+# Dependencias opcionales: si no están instaladas solo se negocia gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# ==========================================
+# 🗜️ COMPRESIÓN NEGOCIADA (gzip / br / zstd)
+# ==========================================
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+# Preferencia del servidor cuando el cliente acepta varias con el mismo q
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+SERVER_PREFERENCE = ["zstd", "br", "gzip"]
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Elige la codificación según Accept-Encoding (con q-values) y lo instalado."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    best, best_q = None, 0.0
+    for name in SERVER_PREFERENCE:
+        if name not in ENCODERS:
+            continue
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+# ==========================================
+# 🏷️ ETAG POR CODIFICACIÓN
+# ==========================================
+# Un ETag fuerte identifica bytes exactos: el cuerpo gzip y el sin comprimir
+# no pueden compartirlo. Al comprimir se añade "-<codificación>" dentro de las
+# comillas, y se quita de If-None-Match antes de que lo vea la app (que sigue
+# comparando con su ETag base).
+def etag_with_encoding(etag: str, encoding: str) -> str:
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_etag_encodings(if_none_match: str) -> tuple[str, dict[str, str]]:
+    """If-None-Match sin sufijos de codificación y {ETag base: codificación} de los que lo traían."""
+    tags, encoded = [], {}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        for name in SERVER_PREFERENCE:
+            suffix = f'-{name}"'
+            if tag.endswith(suffix):
+                base = tag[:-len(suffix)] + '"'
+                encoded[base.removeprefix("W/")] = name
+                tag = base
+                break
+        tags.append(tag)
+    return ", ".join(tags), encoded
+
+
+def restore_etag_encoding(raw_headers: list, encoded: dict[str, str]) -> list:
+    """Cabeceras ASGI con el sufijo de codificación devuelto al ETag que lo traía en la petición."""
+    restored = []
+    for key, value in raw_headers:
+        if key.lower() == b"etag":
+            etag = value.decode("latin-1")
+            name = encoded.get(etag.removeprefix("W/"))
+            if name:
+                value = etag_with_encoding(etag, name).encode("latin-1")
+        restored.append((key, value))
+    return restored
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(data) + encoder.finish()
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI: comprime respuestas JSON/NDJSON/texto por encima de
+    COMPRESSION_MIN_SIZE. Las respuestas en streaming (export) se comprimen
+    por trozos, vaciando el compresor en cada uno para no retener datos.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict((k.decode("latin-1").lower(), v.decode("latin-1")) for k, v in scope["headers"])
+        encoded_tags = {}
+        if "if-none-match" in headers:
+            if_none_match, encoded_tags = strip_etag_encodings(headers["if-none-match"])
+            if encoded_tags:
+                scope = dict(scope)
+                scope["headers"] = [
+                    (k, if_none_match.encode("latin-1") if k.lower() == b"if-none-match" else v)
+                    for k, v in scope["headers"]
+                ]
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding is None and not encoded_tags:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "encoder": None, "passthrough": encoding is None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                if message["status"] == 304 and encoded_tags:
+                    # 304 de una versión comprimida: se devuelve el ETag tal como lo tiene el cliente
+                    message["headers"] = restore_etag_encoding(message["headers"], encoded_tags)
+                if state["passthrough"]:
+                    return await send(message)
+                state["start"] = message
+                return
+
+            if message["type"] != "http.response.body" or state["passthrough"]:
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            # Primer trozo: decidir si comprimimos
+            if state["encoder"] is None:
+                start = state["start"]
+                response_headers = [(k.decode("latin-1").lower(), v.decode("latin-1")) for k, v in start["headers"]]
+                header_map = dict(response_headers)
+                content_type = header_map.get("content-type", "")
+                compressible = (
+                    start["status"] not in (204, 304)
+                    and "content-encoding" not in header_map
+                    and content_type.startswith(COMPRESSIBLE_TYPES)
+                    and (more_body or len(body) >= self.minimum_size)
+                )
+                if not compressible:
+                    state["passthrough"] = True
+                    await send(start)
+                    return await send(message)
+
+                state["encoder"] = ENCODERS[encoding]()
+                new_headers = [(k, v) for k, v in response_headers if k not in ("content-length", "vary", "etag")]
+                if "etag" in header_map:
+                    new_headers.append(("etag", etag_with_encoding(header_map["etag"], encoding)))
+                vary = header_map.get("vary")
+                new_headers.append(("vary", f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"))
+                new_headers.append(("content-encoding", encoding))
+
+                if not more_body:
+                    compressed = state["encoder"].compress(body) + state["encoder"].finish()
+                    new_headers.append(("content-length", str(len(compressed))))
+                    start["headers"] = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in new_headers]
+                    await send(start)
+                    return await send({"type": "http.response.body", "body": compressed})
+
+                start["headers"] = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in new_headers]
+                await send(start)
+
+            encoder = state["encoder"]
+            if more_body:
+                chunk = encoder.compress(body) + encoder.flush()
+            else:
+                chunk = encoder.compress(body) + encoder.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,79 @@
+"""
+Exporta la tabla videos en streaming (NDJSON o CSV) sin cargarla en memoria.
+
+Uso:
+    python export_catalog.py --format csv -o ../db/data-$(date +%s).csv
+    python export_catalog.py --since 2026-01-13T12:00:00+00:00 -o delta.ndjson
+    python export_catalog.py --state Data/export_state.json -o delta.ndjson
+
+Con --state guarda la última marca (updated_at/created_at) exportada y la
+siguiente ejecución solo vuelca lo que cambió desde entonces.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from database import AsyncSessionLocal
+from functions.Export import EXPORT_FORMATS, iter_export
+
+
+def load_watermark(path: str):
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                value = json.load(f).get("watermark")
+                return datetime.fromisoformat(value) if value else None
+        except Exception:
+            return None
+    return None
+
+
+def save_watermark(path: str, watermark: str):
+    with open(path, "w") as f:
+        json.dump({"watermark": watermark, "last_export": str(datetime.now())}, f, indent=4)
+
+
+async def run_export(args):
+    since = datetime.fromisoformat(args.since) if args.since else load_watermark(args.state)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    stats = {}
+    start = time.time()
+    try:
+        async with AsyncSessionLocal() as session:
+            async for chunk in iter_export(
+                session, args.format, since, stats=stats, level=args.level, language=args.language,
+                accent=args.accent, topic=args.topic, content_types=args.content_types,
+            ):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    elapsed = time.time() - start
+    print(f"📤 {stats.get('rows', 0)} videos exportados en {elapsed:.1f}s"
+          f"{f' (desde {since.isoformat()})' if since else ''}.", file=sys.stderr)
+    if args.state and stats.get("watermark"):
+        save_watermark(args.state, stats["watermark"])
+        print(f"🔖 Próxima exportación incremental desde {stats['watermark']}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto stdout)")
+    parser.add_argument("--since", help="Solo videos creados/modificados después (ISO 8601)")
+    parser.add_argument("--state", help="Archivo JSON donde leer/guardar la marca incremental")
+    parser.add_argument("--level")
+    parser.add_argument("--language")
+    parser.add_argument("--accent")
+    parser.add_argument("--topic")
+    parser.add_argument("--content-types", dest="content_types")
+    asyncio.run(run_export(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
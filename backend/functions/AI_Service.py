@@ -1,9 +1,16 @@
 from http.client import HTTPException
+import asyncio
 import json
-from groq import AsyncGroq, RateLimitError
 from dotenv import load_dotenv
 import os
 import random
+from functions.Prompts import PromptTemplate, get_template
+from functions.GroqKeys import KeyScheduler
+from functions.LLMCache import llm_cache, cache_key
+from functions.LocalAnalysis import analyze_transcript, local_result, local_stats, LOCAL_ANALYSIS_MODE
+from functions.Chunking import (
+    estimate_tokens, chunk_token_budget, split_segments, text_segments, select_chunks, merge_analyses,
+)
 
 load_dotenv()
 
@@ -15,86 +22,105 @@ if not API_KEYS:
     print("❌ ERROR: No se encontraron claves en GROQ_API_KEYS")
     API_KEYS = ["dummy_key"]
 
-async def get_groq_completion(messages, system_instruction, model="llama-3.1-8b-instant"):
-    for i, api_key in enumerate(API_KEYS):
-        try:
-            client = AsyncGroq(api_key=api_key)
-            chat_completion = await client.chat.completions.create(
-                messages=[{"role": "system", "content": system_instruction}],
-                model=model,
-                temperature=0.1,
-                response_format={"type": "json_object"}, 
-                max_completion_tokens=1500,
-            )
-            return chat_completion.choices[0].message.content
-        except RateLimitError:
-            print(f"⚠️ Clave {i+1} agotada (429). Rotando...")
-            continue
-        except Exception as e:
-            if "429" in str(e):
-                print(f"⚠️ Clave {i+1} agotada (Error 429). Rotando...")
-                continue
-            print(f"❌ Error en cliente Groq (Clave {i+1}): {e}")
-            raise e
-    raise Exception("Rate limit reached on ALL keys.")
+# Clientes persistentes por clave + reparto según las cabeceras de rate limit
+key_scheduler = KeyScheduler(API_KEYS)
+MAX_COMPLETION_TOKENS = 1500
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+RESIDUAL_COMPLETION_TOKENS = 15   # '"level": "B2", "wpm_estimate": 150' que el LLM ya no escribe
 
-def load_constraints():
+async def get_groq_completion(messages, model=DEFAULT_MODEL):
+    """Retorna (contenido, tokens totales consumidos)."""
+    # Reserva de presupuesto en la clave elegida
+    est_tokens = sum(estimate_tokens(m["content"]) for m in messages) + MAX_COMPLETION_TOKENS
     try:
-        with open("Data/Etiquetas.json", "r", encoding="utf-8") as f: tags = json.load(f)
-        with open("Data/Niveles.json", "r", encoding="utf-8") as f: levels = json.load(f)
-        with open("Data/Tipos.json", "r", encoding="utf-8") as f: types = json.load(f)
-        return tags, levels, types
-    except: return [], [], []
+        chat_completion = await key_scheduler.complete(
+            est_tokens,
+            messages=messages,
+            model=model,
+            temperature=0.1,
+            response_format={"type": "json_object"}, 
+            max_completion_tokens=MAX_COMPLETION_TOKENS,
+        )
+    except Exception as e:
+        print(f"❌ Error en cliente Groq: {e}")
+        raise e
+    usage = getattr(chat_completion, "usage", None)
+    return chat_completion.choices[0].message.content, getattr(usage, "total_tokens", 0) or 0
 
-def GetPrompt(transcript_text, tags, levels, types):
-    tags_str = ", ".join([f'"{t}"' for t in tags]) if tags else "Technology, Business"
-    levels_str = ", ".join([f'"{l}"' for l in levels]) if levels else "B1, B2"
-    types_str = ", ".join([f'"{t}"' for t in types]) if types else "General"
+async def analyze_prompt(template: PromptTemplate, user_content: str) -> dict:
+    """Una llamada (con caché local): transcripción (mensaje user) -> JSON de análisis."""
+    key = cache_key(DEFAULT_MODEL, template.id, user_content)
+    cached = await llm_cache.get(key)
+    if cached is not None:
+        print("♻️ Análisis IA servido desde la caché local.")
+        return cached
     
-    # --- JSON ESTRUCTURA SIMPLIFICADA (SIN summary NI functional_use) ---
-    json_structure = {
-        "transcript_summary": "Detailed summary (max 500 chars) (ENGLISH).",
-        "level": "One value from list.",
-        "topics": ["Tag1", "Tag2", "Tag3"],
-        "accents": ["US", "British"],
-        "content_types": ["Type1"],
-        "wpm_estimate": 150,
-        "vocabulary": [{ "term": "Word", "definition": "Short definition in English." }],
-        "grammar_stats": { "subjunctive": "Low", "past_tense": "Medium", "future_tense": "Low", "connectors": "High" }
-    }
-
-    prompt = f"""
-    Role: Expert English linguist.
-    Task: Extract metadata. ALL OUTPUT MUST BE IN ENGLISH.
+    try:
+        text_resp, total_tokens = await get_groq_completion([
+            {"role": "system", "content": template.system},
+            {"role": "user", "content": user_content},
+        ])
+    except Exception as e:
+        return {"error": f"Todas las claves fallaron: {str(e)}"}
     
-    CONSTRAINTS:
-    1. LEVEL: [{levels_str}]
-    2. TOPICS: Choose 3 from [{tags_str}]
-    3. CONTENT_TYPES: Choose from [{types_str}]
-    4. ACCENTS: Infer list based on context.
+    try:
+        result = json.loads(text_resp)
+    except json.JSONDecodeError:
+        return {"error": "Failed to parse AI response"}
+    await llm_cache.put(key, DEFAULT_MODEL, template.id, result, total_tokens)
+    return result
 
-    OUTPUT JSON STRUCTURE:
-    {json.dumps(json_structure)}
-    
-    TRANSCRIPT:
-    "{transcript_text[:6000]}" 
+async def generate_response(transcript_text, segments=None, context="", wpm=None) -> dict:
+    """
+    Analiza la transcripción completa: se trocea por segmentos según el
+    presupuesto del modelo, los trozos van en paralelo y se fusionan.
+    `context` (ej: país del canal) se antepone a cada trozo. Si el análisis
+    local da un CEFR claro, el LLM solo responde lo que falta (o nada en
+    LOCAL_ANALYSIS_MODE=skip).
     """
-    return prompt
-
-async def generate_response(transcript_text) -> dict:
     try:
-        tags, levels, types = load_constraints()
-        system_instruction = GetPrompt(transcript_text, tags, levels, types)
-        
-        try:
-            text_resp = await get_groq_completion([], system_instruction)
-        except Exception as e:
-            return {"error": f"Todas las claves fallaron: {str(e)}"}
-        
-        try:
-            return json.loads(text_resp)
-        except json.JSONDecodeError:
-            return {"error": "Failed to parse AI response"}
+        local = analyze_transcript(transcript_text, wpm) if LOCAL_ANALYSIS_MODE != "off" else None
+        if local:
+            local_stats["videos"] += 1
+            local_stats["clear"] += int(local["clear"])
+        residual = bool(local and local["clear"] and LOCAL_ANALYSIS_MODE in ("residual", "skip"))
+        local_summary = {k: local[k] for k in ("cefr_estimate", "difficulty", "zipf_p5", "clear")} if local else None
+
+        full_template = get_template()
+        if residual and LOCAL_ANALYSIS_MODE == "skip":
+            local_stats["skipped_calls"] += 1
+            local_stats["tokens_saved"] += (estimate_tokens(full_template.system) + estimate_tokens(transcript_text)
+                                            + MAX_COMPLETION_TOKENS)
+            print(f"📐 CEFR local claro ({local['cefr_estimate']}): sin llamada al LLM.")
+            return {**local_result(local), "local_analysis": local_summary, "prompt_version": "local"}
+
+        template = get_template(residual=residual)
+        candidates = local["candidate_vocabulary"] if residual else None
+        overhead = estimate_tokens(template.system) + estimate_tokens(context) + 10
+        budget = chunk_token_budget(DEFAULT_MODEL, MAX_COMPLETION_TOKENS, overhead)
+        chunks = select_chunks(split_segments(segments or text_segments(transcript_text), budget))
+        if not chunks:
+            chunks = [(transcript_text, estimate_tokens(transcript_text))]
+        if len(chunks) > 1:
+            print(f"✂️ Transcripción en {len(chunks)} trozos (~{budget} tokens máx. cada uno).")
+
+        results = await asyncio.gather(*(
+            analyze_prompt(template, template.user_message(text, context, candidates)) for text, _ in chunks
+        ))
+        ok = [(result, tokens) for result, (_, tokens) in zip(results, chunks) if "error" not in result]
+        if not ok:
+            return results[0]
+        if len(ok) < len(results):
+            print(f"⚠️ {len(results) - len(ok)}/{len(results)} trozos fallaron; se fusionan los demás.")
+        merged = {**merge_analyses(ok), "prompt_version": template.id, "local_analysis": local_summary}
+        if residual:
+            merged["level"] = local["cefr_estimate"]
+            merged["wpm_estimate"] = wpm
+            local_stats["residual_calls"] += len(chunks)
+            local_stats["tokens_saved"] += len(chunks) * (
+                estimate_tokens(full_template.system) - estimate_tokens(template.system) + RESIDUAL_COMPLETION_TOKENS
+            )
+        return merged
 
     except Exception as e:
-        return {"error": f"Error General IA: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Error General IA: {str(e)}"}
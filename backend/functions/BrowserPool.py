@@ -0,0 +1,133 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("Scraper")
+
+# ==========================================
+# 🌐 POOL DE NAVEGADORES REUTILIZABLES
+# ==========================================
+# Arrancar Chrome (uc) y pasar el aviso de cookies es lo más lento de cada
+# video. Las sesiones se reutilizan entre videos y se reciclan tras
+# BROWSER_MAX_PAGES páginas o si el navegador falla.
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "40"))
+# Pausa aleatoria entre páginas de la misma sesión (protege la IP)
+BROWSER_PAGE_DELAY_MIN = float(os.getenv("BROWSER_PAGE_DELAY_MIN", "1.0"))
+BROWSER_PAGE_DELAY_MAX = float(os.getenv("BROWSER_PAGE_DELAY_MAX", "2.5"))
+
+COOKIE_SELECTORS = [
+    'button[aria-label*="Rechazar"]', 'button:contains("Rechazar")', 
+    'button[aria-label*="Reject"]', 'button:contains("Reject")',    
+    'form[action*="consent"] button',
+    'ytd-consent-bump-v2-lightbox button'
+]
+
+
+class BrowserSession:
+    """Un Chrome undetected de larga duración (SB abierto fuera del `with`)."""
+
+    _counter = 0
+
+    def __init__(self, locale: str, user_data_dir: str | None = None):
+        BrowserSession._counter += 1
+        self.session_id = BrowserSession._counter
+        options = {"uc": True, "test": True, "headless": True, "locale_code": locale}
+        if user_data_dir:
+            options["user_data_dir"] = user_data_dir
+        # Import diferido: importar el módulo (p. ej. desde Metadata en los
+        # tests) no exige tener instalada la pila del navegador
+        from seleniumbase import SB
+        self._context = SB(**options)
+        self.sb = self._context.__enter__()
+        self.pages = 0
+        self.consent_done = False
+        self.broken = False
+        self.last_used = 0.0
+        logger.info(f"🌐 Navegador #{self.session_id} iniciado ({locale}).")
+
+    def open(self, url: str):
+        if self.pages == 0:
+            self.sb.maximize_window()
+            self.sb.activate_cdp_mode(url)
+        else:
+            # Pausa corta entre videos en lugar de relanzar el navegador
+            elapsed = time.time() - self.last_used
+            delay = random.uniform(BROWSER_PAGE_DELAY_MIN, BROWSER_PAGE_DELAY_MAX)
+            if elapsed < delay:
+                time.sleep(delay - elapsed)
+            self.sb.cdp.open(url)
+        self.pages += 1
+        self.last_used = time.time()
+
+    def handle_consent(self):
+        """Rechaza cookies una sola vez por sesión (la elección queda guardada)."""
+        if self.consent_done:
+            return
+        self.sb.sleep(2)
+        for selector in COOKIE_SELECTORS:
+            if self.sb.is_element_visible(selector):
+                self.sb.click(selector)
+                self.sb.sleep(1)
+                break
+        self.consent_done = True
+
+    def close(self):
+        try:
+            self._context.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"⚠️ Error cerrando navegador #{self.session_id}: {str(e)[:50]}")
+        logger.info(f"♻️ Navegador #{self.session_id} cerrado tras {self.pages} páginas.")
+
+
+class BrowserPool:
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_pages: int = BROWSER_MAX_PAGES,
+                 locale: str = "en", user_data_dir: str | None = None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.locale = locale
+        self.user_data_dir = user_data_dir
+        self._idle: queue.LifoQueue[BrowserSession] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._closed = False
+
+    def _new_session(self) -> BrowserSession:
+        return BrowserSession(self.locale, self.user_data_dir)
+
+    @contextmanager
+    def session(self):
+        """
+        Presta una sesión (bloquea si las `size` están ocupadas). Al devolverla
+        se recicla si está rota o ya sirvió `max_pages` páginas.
+        """
+        self._slots.acquire()
+        browser = None
+        try:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                browser = self._new_session()
+            yield browser
+        except Exception:
+            if browser is not None:
+                browser.broken = True
+            raise
+        finally:
+            if browser is not None:
+                if browser.broken or browser.pages >= self.max_pages or self._closed:
+                    browser.close()
+                else:
+                    self._idle.put(browser)
+            self._slots.release()
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
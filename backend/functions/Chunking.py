@@ -0,0 +1,169 @@
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+# ==========================================
+# ✂️ TROCEO DE TRANSCRIPCIONES LARGAS (MAP-REDUCE)
+# ==========================================
+# En vez de cortar la transcripción a los primeros 6000 caracteres, se parte
+# por los segmentos de transcript_json en trozos que caben en el contexto
+# del modelo y en el presupuesto por minuto de una clave. Los trozos se
+# analizan a la vez (el KeyScheduler los reparte entre claves) y aquí se
+# fusionan en el mismo esquema de ai_analysis que da una sola llamada.
+
+# Límites por modelo (tokens). tpm = tokens por minuto de una clave gratuita.
+MODEL_LIMITS = {
+    "llama-3.1-8b-instant": {"context": 131072, "tpm": 6000},
+    "llama-3.3-70b-versatile": {"context": 131072, "tpm": 12000},
+}
+DEFAULT_LIMITS = {"context": 8192, "tpm": 6000}
+PROMPT_OVERHEAD_TOKENS = 500        # Rol, restricciones y estructura JSON del prompt
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "0"))     # 0 = según el modelo
+ANALYSIS_MAX_CHUNKS = int(os.getenv("ANALYSIS_MAX_CHUNKS", "8"))
+VOCABULARY_MAX_TERMS = 40
+
+GRAMMAR_SCALE = ["Low", "Medium", "High"]
+CEFR_ORDER = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+_WORD = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimación para tokenizadores BPE (Llama): palabras y signos cuentan como
+    piezas y las palabras largas se parten. Nunca por debajo de len/4.
+    """
+    if not text:
+        return 0
+    pieces = sum(1 + len(piece) // 8 for piece in _WORD.findall(text))
+    return max(pieces, math.ceil(len(text) / 4))
+
+
+def chunk_token_budget(model: str, completion_tokens: int, overhead_tokens: int = PROMPT_OVERHEAD_TOKENS) -> int:
+    """Tokens de transcripción por llamada: lo que deja libre el contexto y el TPM de una clave."""
+    if CHUNK_MAX_TOKENS > 0:
+        return CHUNK_MAX_TOKENS
+    limits = MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+    budget = min(limits["context"], limits["tpm"]) - completion_tokens - overhead_tokens
+    return max(budget, 500)
+
+
+def text_segments(text: str) -> list[dict]:
+    """Sin transcript_json: frases como segmentos."""
+    return [{"start": 0, "text": s} for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+
+def split_segments(segments: list[dict], max_tokens: int) -> list[tuple[str, int]]:
+    """Agrupa segmentos consecutivos sin pasar de `max_tokens`. Retorna [(texto, tokens)]."""
+    chunks, current, current_tokens = [], [], 0
+    for seg in segments:
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        tokens = estimate_tokens(text) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append((" ".join(current), current_tokens))
+    return chunks
+
+
+def select_chunks(chunks: list, max_chunks: int = ANALYSIS_MAX_CHUNKS) -> list:
+    """Videos larguísimos: muestra uniforme de trozos en vez de solo el principio."""
+    if max_chunks <= 0 or len(chunks) <= max_chunks:
+        return chunks
+    step = len(chunks) / max_chunks
+    return [chunks[int(i * step)] for i in range(max_chunks)]
+
+
+# --- REDUCE ---
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _ranked(votes: Counter, first_seen: dict, limit: int | None = None) -> list:
+    ranked = sorted(votes, key=lambda k: (-votes[k], first_seen[k]))
+    return ranked[:limit] if limit else ranked
+
+
+def _vote(results: list[tuple[dict, float]], field: str, limit: int | None = None) -> list:
+    votes, first_seen = Counter(), {}
+    for data, weight in results:
+        for value in _as_list(data.get(field)):
+            if isinstance(value, str) and value.strip():
+                votes[value] += weight
+                first_seen.setdefault(value, len(first_seen))
+    return _ranked(votes, first_seen, limit)
+
+
+def _weighted_median_level(results: list[tuple[dict, float]]):
+    weighted = sorted((CEFR_ORDER.index(d["level"]), w) for d, w in results if d.get("level") in CEFR_ORDER)
+    if not weighted:
+        return next((d.get("level") for d, _ in results if d.get("level")), None)
+    half, acc = sum(w for _, w in weighted) / 2, 0.0
+    for index, weight in weighted:
+        acc += weight
+        if acc >= half:
+            return CEFR_ORDER[index]
+
+
+def _merge_grammar(results: list[tuple[dict, float]]) -> dict:
+    sums, weights = defaultdict(float), defaultdict(float)
+    for data, weight in results:
+        stats = data.get("grammar_stats")
+        if not isinstance(stats, dict):
+            continue
+        for name, label in stats.items():
+            if label in GRAMMAR_SCALE:
+                sums[name] += GRAMMAR_SCALE.index(label) * weight
+                weights[name] += weight
+    return {name: GRAMMAR_SCALE[round(sums[name] / weights[name])] for name in sums}
+
+
+def _merge_vocabulary(results: list[tuple[dict, float]]) -> list[dict]:
+    votes, first_seen, entries = Counter(), {}, {}
+    for data, _ in results:
+        for item in data.get("vocabulary") or []:
+            term = (item.get("term") or "").strip() if isinstance(item, dict) else ""
+            if not term:
+                continue
+            key = term.lower()
+            votes[key] += 1
+            first_seen.setdefault(key, len(first_seen))
+            entries.setdefault(key, item)
+    return [entries[key] for key in _ranked(votes, first_seen, VOCABULARY_MAX_TERMS)]
+
+
+def _merge_summary(results: list[tuple[dict, float]], max_chars: int = 500) -> str:
+    # Primera frase de cada trozo, en orden: cubre todo el video
+    sentences = []
+    for data, _ in results:
+        summary = (data.get("transcript_summary") or "").strip()
+        if summary:
+            sentences.append(re.split(r"(?<=[.!?])\s+", summary)[0])
+    merged = " ".join(sentences)
+    return merged if len(merged) <= max_chars else merged[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+def merge_analyses(results: list[tuple[dict, float]]) -> dict:
+    """[(respuesta de un trozo, peso en tokens)] -> un único ai_analysis."""
+    if len(results) == 1:
+        return results[0][0]
+    wpms = [(d["wpm_estimate"], w) for d, w in results if isinstance(d.get("wpm_estimate"), (int, float))]
+    return {
+        "transcript_summary": _merge_summary(results),
+        "level": _weighted_median_level(results),
+        "topics": _vote(results, "topics", 3),
+        "accents": _vote(results, "accents"),
+        "content_types": _vote(results, "content_types", 3),
+        "wpm_estimate": round(sum(v * w for v, w in wpms) / sum(w for _, w in wpms)) if wpms else None,
+        "vocabulary": _merge_vocabulary(results),
+        "grammar_stats": _merge_grammar(results),
+    }
@@ -0,0 +1,112 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from database import AsyncSessionLocal
+from models.crawl import PlaylistState
+from functions.Metadata import get_playlist_window
+
+# ==========================================
+# 🧭 RASTREO INCREMENTAL DE PLAYLISTS
+# ==========================================
+# En vez de enumerar la playlist completa en cada ciclo, se guarda por
+# playlist qué IDs ya se vieron, hasta qué posición se ha recorrido y cuáles
+# faltan por procesar. Cada visita hace:
+#   1. Sonda de cabecera (posiciones 1..PLAYLIST_HEAD_PROBE): detecta videos
+#      añadidos arriba y el tamaño actual de la playlist.
+#   2. Si hay pocos trabajos listos en crawl_jobs, recorre ventanas nuevas a
+#      partir de last_position (playliststart/playlistend). Así las playlists
+#      grandes se recorren a lo largo de varios ciclos y los añadidos al final
+#      se encuentran cuando el recorrido llega a ellos.
+#   3. Si nada cambió y no queda nada pendiente, la playlist se salta.
+# Los IDs nuevos se dan de alta en la cola duradera (functions/Jobs.py).
+PLAYLIST_HEAD_PROBE = int(os.getenv("PLAYLIST_HEAD_PROBE", "10"))
+PLAYLIST_WINDOW = int(os.getenv("PLAYLIST_WINDOW", "50"))
+PLAYLIST_MAX_WINDOWS = int(os.getenv("PLAYLIST_MAX_WINDOWS", "4"))  # Ventanas por visita
+
+STATE_FIELDS = ("known_ids", "head_ids", "last_position",
+                "total_count", "last_seen_at", "last_changed_at")
+
+
+class PlaylistCrawler:
+    def __init__(self, get_existing_ids, jobs):
+        # get_existing_ids: async (list[str]) -> set[str] con los que ya están en videos
+        self.get_existing_ids = get_existing_ids
+        self.jobs = jobs
+
+    async def load_state(self, playlist_url: str) -> dict:
+        async with AsyncSessionLocal() as session:
+            row = await session.get(PlaylistState, playlist_url)
+        state = {field: getattr(row, field) if row else None for field in STATE_FIELDS}
+        state["known_ids"] = list(state["known_ids"] or [])
+        state["head_ids"] = list(state["head_ids"] or [])
+        state["last_position"] = state["last_position"] or 0
+        return state
+
+    async def save_state(self, playlist_url: str, state: dict):
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.merge(PlaylistState(playlist_url=playlist_url, **state))
+
+    async def _unseen(self, video_ids: list[str], known: dict) -> list[str]:
+        """Marca como conocidos y devuelve los que no están ni vistos ni en la DB."""
+        fresh = [vid for vid in video_ids if vid not in known]
+        for vid in fresh:
+            known[vid] = None
+        existing = await self.get_existing_ids(fresh)
+        return [vid for vid in fresh if vid not in existing]
+
+    async def discover(self, playlist_url: str, limit: int) -> int:
+        """Encola los videos nuevos de la playlist (hasta tener ~`limit` listos). Retorna cuántos."""
+        state = await self.load_state(playlist_url)
+        known = dict.fromkeys(state["known_ids"])
+        first_visit = state["last_seen_at"] is None
+
+        try:
+            head, count = await asyncio.to_thread(get_playlist_window, playlist_url, 1, PLAYLIST_HEAD_PROBE)
+        except Exception as e:
+            print(f"⚠️ No se pudo sondear la playlist: {str(e)[:80]}")
+            return 0
+
+        head_ids = [vid for _, vid in head]
+        changed = first_visit or head_ids != state["head_ids"] or count != state["total_count"]
+
+        # Videos añadidos arriba desplazan las posiciones ya recorridas
+        added_on_top = [vid for vid in head_ids if vid not in known]
+        if not first_visit:
+            state["last_position"] += len(added_on_top)
+        state["last_position"] = max(state["last_position"], len(head_ids))
+
+        ready = await self.jobs.ready_count(playlist_url)
+        discovered = await self._unseen(head_ids, known)
+
+        # Recorrido en profundidad: solo si hace falta trabajo para esta tanda
+        windows = 0
+        while ready + len(discovered) < limit and windows < PLAYLIST_MAX_WINDOWS and (count is None or state["last_position"] < count):
+            start = state["last_position"] + 1
+            try:
+                window, count = await asyncio.to_thread(get_playlist_window, playlist_url, start, start + PLAYLIST_WINDOW - 1)
+            except Exception as e:
+                print(f"⚠️ Ventana {start}+ falló: {str(e)[:80]}")
+                break
+            windows += 1
+            if not window:
+                count = state["last_position"]  # Final de la playlist
+                break
+            discovered += await self._unseen([vid for _, vid in window], known)
+            state["last_position"] = window[-1][0]
+
+        queued = await self.jobs.enqueue(discovered, playlist_url)
+
+        now = datetime.now(timezone.utc)
+        walked = f"{state['last_position']}/{count if count is not None else '?'}"
+        if not changed and not ready and not queued and windows == 0:
+            print(f"💤 Playlist sin cambios (recorrida {walked}). Se salta.")
+        else:
+            print(f"🧭 Recorrido {walked} | {queued} nuevos en cola ({ready} ya listos) | {windows} ventanas nuevas.")
+        if changed or windows:
+            state["last_changed_at"] = now
+
+        state.update(known_ids=list(known), head_ids=head_ids, total_count=count, last_seen_at=now)
+        await self.save_state(playlist_url, state)
+        return queued
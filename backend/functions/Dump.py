@@ -0,0 +1,111 @@
+import csv
+import json
+import sys
+from datetime import datetime
+
+# ==========================================
+# 📦 FORMATO DE LOS VOLCADOS DEL CATÁLOGO
+# ==========================================
+# Los volcados (db/data-*.csv) salen de Postgres tal cual: arrays como
+# literales '{a,"b c"}' y columnas JSON como texto.
+DUMP_COLUMNS = [
+    "video_id", "title", "url", "channel_name", "topics", "accents", "content_types",
+    "level", "wpm", "subtitle_source", "ai_analysis", "created_at", "updated_at",
+    "transcript", "language", "transcript_json",
+]
+ARRAY_COLUMNS = ("topics", "accents", "content_types")
+JSON_COLUMNS = ("ai_analysis", "transcript_json")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+INT_COLUMNS = ("wpm",)
+NULL_TOKEN = "NULL"   # Así escribe los nulos el volcado original
+
+# Las transcripciones superan el límite por defecto del módulo csv (128 KB)
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def parse_pg_array(literal: str | None) -> list[str]:
+    """Convierte un literal de array de Postgres ('{a,"b c",NULL}') en lista."""
+    if literal is None or literal == "":
+        return []
+    if not (literal.startswith("{") and literal.endswith("}")):
+        return [literal]
+
+    items, current = [], []
+    in_quotes = quoted = escaped = False
+    for ch in literal[1:-1]:
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            in_quotes = not in_quotes
+            quoted = True
+        elif ch == "," and not in_quotes:
+            value = "".join(current)
+            if quoted or value != "NULL":
+                items.append(value)
+            current, quoted = [], False
+        else:
+            current.append(ch)
+    if current or quoted:
+        value = "".join(current)
+        if quoted or value != "NULL":
+            items.append(value)
+    return items
+
+
+def format_pg_array(values) -> str:
+    """Lista -> literal de array de Postgres, como en los volcados."""
+    if not values:
+        return "{}"
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+            continue
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        items.append(f'"{text}"')
+    return "{" + ",".join(items) + "}"
+
+
+def parse_dump_row(raw: dict, parse_json: bool = True) -> dict:
+    """
+    Fila de un volcado CSV (todo texto) -> valores Python. Con
+    parse_json=False las columnas JSON se dejan como texto, que es lo que
+    espera COPY.
+    """
+    row = {}
+    for name, value in raw.items():
+        if name not in DUMP_COLUMNS:
+            continue
+        if value == NULL_TOKEN or (value == "" and name not in ("title", "url", "channel_name", "transcript")):
+            row[name] = [] if name in ARRAY_COLUMNS else None
+        elif name in ARRAY_COLUMNS:
+            row[name] = parse_pg_array(value)
+        elif name in JSON_COLUMNS:
+            row[name] = json.loads(value) if parse_json else value
+        elif name in TIMESTAMP_COLUMNS:
+            row[name] = datetime.fromisoformat(value)
+        elif name in INT_COLUMNS:
+            row[name] = int(value)
+        else:
+            row[name] = value
+    return row
+
+
+def parse_ndjson_row(raw: dict) -> dict:
+    """Fila NDJSON de export_catalog.py -> mismos tipos que parse_dump_row(parse_json=False)."""
+    row = {}
+    for name in DUMP_COLUMNS:
+        if name not in raw:
+            continue
+        value = raw[name]
+        if name in JSON_COLUMNS and value is not None:
+            value = json.dumps(value, ensure_ascii=False)
+        elif name in TIMESTAMP_COLUMNS and value:
+            value = datetime.fromisoformat(value)
+        elif name in ARRAY_COLUMNS:
+            value = value or []
+        row[name] = value
+    return row
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import func, select
+
+from models.video import Video
+from functions.Dump import ARRAY_COLUMNS, DUMP_COLUMNS, JSON_COLUMNS, NULL_TOKEN, format_pg_array
+from functions.Search import apply_filters
+
+# ==========================================
+# 📤 EXPORTACIÓN EN STREAMING
+# ==========================================
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_CHUNK_ROWS = 500   # Filas por viaje del cursor de servidor
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_query(since: datetime | None = None, **filters):
+    """
+    SELECT de las columnas del volcado. Con `since` solo devuelve lo creado o
+    modificado después, ordenado por esa marca para poder sincronizar deltas.
+    """
+    columns = [Video.__table__.c[name] for name in DUMP_COLUMNS]
+    changed_at = func.coalesce(Video.updated_at, Video.created_at)
+    query = apply_filters(select(*columns), **filters)
+    if since is not None:
+        query = query.where(changed_at > since)
+    return query.order_by(changed_at, Video.video_id)
+
+
+def row_to_dict(row) -> dict:
+    return {name: _plain(row[name]) for name in DUMP_COLUMNS}
+
+
+def encode_ndjson(rows: list[dict]) -> bytes:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8")
+
+
+def encode_csv(rows: list[dict], header: bool = False) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if header:
+        writer.writerow(DUMP_COLUMNS)
+    for r in rows:
+        values = []
+        for name in DUMP_COLUMNS:
+            value = r[name]
+            if name in ARRAY_COLUMNS:
+                value = format_pg_array(value)
+            elif name in JSON_COLUMNS and value is not None:
+                value = json.dumps(value, ensure_ascii=False)
+            values.append(NULL_TOKEN if value is None else value)
+        writer.writerow(values)
+    return out.getvalue().encode("utf-8")
+
+
+async def iter_export(session, fmt: str = "ndjson", since: datetime | None = None, stats: dict | None = None, **filters):
+    """
+    Genera el volcado por trozos de bytes usando un cursor de servidor
+    (yield_per), así la memoria no crece con el número de filas.
+    `stats` (opcional) recibe el número de filas y la última marca exportada.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, watermark=None)
+
+    if fmt == "csv":
+        yield encode_csv([], header=True)
+
+    query = export_query(since, **filters).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    result = await session.stream(query)
+    async for partition in result.mappings().partitions():
+        rows = [row_to_dict(r) for r in partition]
+        stats["rows"] += len(rows)
+        last = rows[-1]
+        stats["watermark"] = last["updated_at"] or last["created_at"]
+        yield encode_ndjson(rows) if fmt == "ndjson" else encode_csv(rows)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+# ==========================================
+# 🗂️ CATÁLOGO DE FILTROS (Data/*.json)
+# ==========================================
+# Se carga una vez al arrancar y solo se relee si cambia el mtime de algún
+# archivo. Lo comparten GET /videos/filters y el prompt de la IA.
+DATA_DIR = "Data"
+FILTER_FILES = {
+    "levels": "Niveles.json",
+    "topics": "Etiquetas.json",
+    "content_types": "Tipos.json",
+    "accents_data": "accents.json",
+}
+# Valor por defecto si el archivo no existe o no se puede leer
+EMPTY_VALUES = {"levels": [], "topics": [], "content_types": [], "accents_data": {}}
+CHECK_INTERVAL = 2.0  # segundos entre comprobaciones de mtime
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class FilterSnapshot:
+    data: Mapping[str, Any]   # Estructura inmutable (tuplas / MappingProxyType)
+    body: bytes               # JSON ya serializado para la respuesta HTTP
+    etag: str                 # ETag fuerte derivado del contenido
+    mtimes: tuple
+
+
+class FilterCatalog:
+    def __init__(self, base_path: str = DATA_DIR):
+        self.base_path = base_path
+        self._snapshot: FilterSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _mtimes(self) -> tuple:
+        mtimes = []
+        for filename in FILTER_FILES.values():
+            try:
+                mtimes.append(os.stat(os.path.join(self.base_path, filename)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load(self, mtimes: tuple) -> FilterSnapshot:
+        raw = {}
+        for key, filename in FILTER_FILES.items():
+            path = os.path.join(self.base_path, filename)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    raw[key] = json.load(f) or EMPTY_VALUES[key]
+            except FileNotFoundError:
+                raw[key] = EMPTY_VALUES[key]
+            except Exception as e:
+                print(f"❌ Error cargando {filename}: {e}")
+                # Mantenemos la última versión buena si la había
+                previous = self._snapshot.data.get(key) if self._snapshot else None
+                raw[key] = _thaw(previous) if previous is not None else EMPTY_VALUES[key]
+
+        body = json.dumps(raw, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return FilterSnapshot(data=_freeze(raw), body=body, etag=etag, mtimes=mtimes)
+
+    def get(self) -> FilterSnapshot:
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < CHECK_INTERVAL:
+            return snapshot
+        with self._lock:
+            mtimes = self._mtimes()
+            if self._snapshot is None or self._snapshot.mtimes != mtimes:
+                self._snapshot = self._load(mtimes)
+                print("🗂️ Filtros cargados desde Data/.")
+            self._checked_at = now
+            return self._snapshot
+
+
+filter_catalog = FilterCatalog()
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import re
+import time
+
+from groq import AsyncGroq, RateLimitError
+
+# ==========================================
+# 🔑 PLANIFICADOR DE CLAVES GROQ
+# ==========================================
+# Un AsyncGroq por clave, creado una vez y reutilizado (su pool HTTP
+# también). Tras cada respuesta se leen las cabeceras x-ratelimit-* y la
+# siguiente llamada va a la clave con más margen, restando lo que ya está
+# en vuelo. Un 429 bloquea esa clave hasta su retry-after (sin reintentos
+# internos del SDK: max_retries=0) y la llamada pasa a otra clave.
+GROQ_KEY_MAX_WAIT = float(os.getenv("GROQ_KEY_MAX_WAIT", "120"))   # Espera máxima por una clave libre
+GROQ_DEFAULT_RETRY_AFTER = 10.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset(value: str | None) -> float | None:
+    """'2m59.56s' / '7.66s' / '120ms' / '3' -> segundos."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def _int_header(headers, name: str) -> int | None:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class KeyState:
+    def __init__(self, index: int, api_key: str):
+        self.index = index
+        self.api_key = api_key
+        self._client: AsyncGroq | None = None
+        self.limit_requests: int | None = None
+        self.limit_tokens: int | None = None
+        self.remaining_requests: int | None = None
+        self.remaining_tokens: int | None = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.rate_limited = 0
+
+    @property
+    def client(self) -> AsyncGroq:
+        if self._client is None:
+            self._client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    def update(self, headers):
+        """Anota el presupuesto que informa Groq en la respuesta."""
+        now = time.time()
+        self.limit_requests = _int_header(headers, "x-ratelimit-limit-requests") or self.limit_requests
+        self.limit_tokens = _int_header(headers, "x-ratelimit-limit-tokens") or self.limit_tokens
+        remaining = _int_header(headers, "x-ratelimit-remaining-requests")
+        if remaining is not None:
+            self.remaining_requests = remaining
+            self.requests_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-requests")) or 0)
+        remaining = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if remaining is not None:
+            self.remaining_tokens = remaining
+            self.tokens_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0)
+
+    def block(self, headers):
+        """429: la clave descansa lo que diga retry-after (o hasta el reset conocido)."""
+        self.update(headers)
+        self.rate_limited += 1
+        wait = parse_reset(headers.get("retry-after"))
+        if wait is None:
+            pending = [t - time.time() for t in (self.requests_reset_at, self.tokens_reset_at) if t > time.time()]
+            wait = max(pending) if pending else GROQ_DEFAULT_RETRY_AFTER
+        self.blocked_until = time.time() + wait
+
+    def _budget(self, remaining, limit, reset_at, now) -> float:
+        # Sin datos o ventana ya reiniciada: se asume la clave completa
+        if remaining is None or now >= reset_at:
+            return 1.0
+        return remaining / limit if limit else (1.0 if remaining > 0 else 0.0)
+
+    def headroom(self, est_tokens: int, now: float) -> float | None:
+        """Fracción de presupuesto libre (None si no puede atender ahora)."""
+        if now < self.blocked_until:
+            return None
+        requests = self._budget(self.remaining_requests, self.limit_requests, self.requests_reset_at, now)
+        tokens = self._budget(self.remaining_tokens, self.limit_tokens, self.tokens_reset_at, now)
+        if now < self.requests_reset_at and self.remaining_requests is not None and self.remaining_requests <= self.in_flight:
+            return None
+        if now < self.tokens_reset_at and self.remaining_tokens is not None and \
+                self.remaining_tokens < est_tokens * (self.in_flight + 1):
+            return None
+        return min(requests, tokens) / (1 + self.in_flight)
+
+    def next_free_at(self) -> float:
+        candidates = [self.blocked_until, self.requests_reset_at, self.tokens_reset_at]
+        return min((t for t in candidates if t > time.time()), default=time.time())
+
+    def snapshot(self) -> dict:
+        return {
+            "key": self.index + 1, "in_flight": self.in_flight, "calls": self.calls,
+            "rate_limited": self.rate_limited, "remaining_requests": self.remaining_requests,
+            "remaining_tokens": self.remaining_tokens,
+            "blocked_for_s": round(max(self.blocked_until - time.time(), 0), 1),
+        }
+
+
+class KeyScheduler:
+    def __init__(self, api_keys: list[str], max_wait: float = GROQ_KEY_MAX_WAIT):
+        self.keys = [KeyState(i, key) for i, key in enumerate(api_keys)]
+        self.max_wait = max_wait
+
+    async def acquire(self, est_tokens: int) -> KeyState:
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            scored = [(key.headroom(est_tokens, now), key) for key in self.keys]
+            usable = [(score, key) for score, key in scored if score is not None]
+            if usable:
+                key = max(usable, key=lambda item: (item[0], -item[1].in_flight))[1]
+                key.in_flight += 1
+                return key
+            wake = min(key.next_free_at() for key in self.keys)
+            if wake > deadline:
+                raise RuntimeError("Rate limit reached on ALL keys.")
+            await asyncio.sleep(min(max(wake - now, 0.5), 30))
+
+    async def complete(self, est_tokens: int, **request):
+        """chat.completions.create en la clave con más margen. Devuelve el ChatCompletion."""
+        attempts = 0
+        while True:
+            key = await self.acquire(est_tokens)
+            try:
+                raw = await key.client.chat.completions.with_raw_response.create(**request)
+                key.update(raw.headers)
+                key.calls += 1
+                return raw.parse()
+            except RateLimitError as e:
+                key.block(e.response.headers)
+                print(f"⚠️ Clave {key.index + 1} limitada (429). Descansa {int(key.blocked_until - time.time())}s.")
+                attempts += 1
+                if attempts >= 2 * len(self.keys):
+                    raise
+            finally:
+                key.in_flight -= 1
+
+    def snapshot(self) -> list[dict]:
+        return [key.snapshot() for key in self.keys]
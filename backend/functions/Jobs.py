@@ -0,0 +1,217 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import select, update, func, and_, or_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from database import AsyncSessionLocal
+from models.crawl import CrawlJob, JobStatus
+
+# ==========================================
+# 🗂️ COLA DURADERA DE TRABAJOS (Postgres)
+# ==========================================
+# Cada video descubierto es una fila de crawl_jobs. Un proceso la reclama
+# (FOR UPDATE SKIP LOCKED) con un lease de JOB_LEASE_SECONDS: si muere, el
+# lease caduca y otro proceso la retoma. Los fallos se reintentan con
+# backoff exponencial hasta JOB_MAX_ATTEMPTS; los descartes definitivos
+# (transcripción corta) quedan en 'failed' con next_attempt_at NULL.
+# Un trabajo reclamado queda en 'claimed' hasta que el scraper lo empieza:
+# solo esos recuperan el intento al devolverse a la cola (release).
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "4"))
+JOB_BACKOFF_SECONDS = int(os.getenv("JOB_BACKOFF_SECONDS", "300"))      # 5 min, 10, 20...
+JOB_BACKOFF_MAX_SECONDS = int(os.getenv("JOB_BACKOFF_MAX_SECONDS", "86400"))
+
+ACTIVE = (JobStatus.claimed.value, JobStatus.scraping.value, JobStatus.analyzing.value)
+STARTED = (JobStatus.scraping.value, JobStatus.analyzing.value)
+RETRYABLE = (JobStatus.queued.value, JobStatus.failed.value)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def video_id_from_url(url: str) -> str:
+    if "v=" in url:
+        return url.split("v=")[-1].split("&")[0]
+    return url.rstrip("/").split("/")[-1]
+
+
+def backoff_seconds(attempts: int) -> int:
+    return min(JOB_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), JOB_BACKOFF_MAX_SECONDS)
+
+
+class JobQueue:
+    def __init__(self, owner: str | None = None):
+        self.owner = owner or worker_name()
+
+    def _lease(self):
+        return func.now() + timedelta(seconds=JOB_LEASE_SECONDS)
+
+    async def enqueue(self, video_ids: list[str], playlist_url: str | None = None) -> int:
+        """Da de alta videos descubiertos. Los que ya tienen trabajo no se tocan."""
+        if not video_ids:
+            return 0
+        rows = [{"video_id": vid, "url": f"https://www.youtube.com/watch?v={vid}",
+                 "playlist_url": playlist_url} for vid in dict.fromkeys(video_ids)]
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    pg_insert(CrawlJob).values(rows)
+                    .on_conflict_do_nothing(index_elements=[CrawlJob.video_id])
+                    .returning(CrawlJob.video_id)
+                )
+                return len(result.all())
+
+    def _claimable(self):
+        return or_(
+            and_(CrawlJob.status.in_(RETRYABLE), CrawlJob.next_attempt_at <= func.now(),
+                 CrawlJob.attempts < JOB_MAX_ATTEMPTS),
+            # Lease caducado: el proceso que lo tenía murió a mitad de trabajo
+            and_(CrawlJob.status.in_(ACTIVE), CrawlJob.lease_expires < func.now(),
+                 CrawlJob.attempts < JOB_MAX_ATTEMPTS),
+        )
+
+    def _exhausted(self):
+        # Lease caducado sin intentos restantes: ya no lo reclamará nadie
+        return and_(CrawlJob.status.in_(ACTIVE), CrawlJob.lease_expires < func.now(),
+                    CrawlJob.attempts >= JOB_MAX_ATTEMPTS)
+
+    async def sweep_expired(self, session) -> int:
+        """Pasa a 'failed' definitivo los trabajos activos huérfanos que agotaron sus intentos."""
+        result = await session.execute(
+            update(CrawlJob)
+            .where(self._exhausted())
+            .values(status=JobStatus.failed.value, next_attempt_at=None, lease_owner=None,
+                    lease_expires=None, last_error=func.coalesce(CrawlJob.last_error, "lease_expired"),
+                    updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def ready_count(self, playlist_url: str | None = None) -> int:
+        query = select(func.count()).select_from(CrawlJob).where(self._claimable())
+        if playlist_url:
+            query = query.where(CrawlJob.playlist_url == playlist_url)
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(query)).scalar_one()
+
+    async def claim(self, limit: int, playlist_url: str | None = None) -> list[str]:
+        """Reserva hasta `limit` trabajos para este proceso y devuelve sus URLs."""
+        if limit <= 0:
+            return []
+        candidates = (
+            select(CrawlJob.video_id)
+            .where(self._claimable())
+            .order_by(CrawlJob.next_attempt_at, CrawlJob.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if playlist_url:
+            candidates = candidates.where(CrawlJob.playlist_url == playlist_url)
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                swept = await self.sweep_expired(session)
+                if swept:
+                    print(f"🪦 {swept} trabajos huérfanos sin intentos pasan a 'failed'.")
+                result = await session.execute(
+                    update(CrawlJob)
+                    .where(CrawlJob.video_id.in_(candidates.scalar_subquery()))
+                    .values(status=JobStatus.claimed.value, attempts=CrawlJob.attempts + 1,
+                            lease_owner=self.owner, lease_expires=self._lease(), updated_at=func.now())
+                    .returning(CrawlJob.url)
+                    .execution_options(synchronize_session=False)
+                )
+                return [row[0] for row in result]
+
+    async def _update_owned(self, video_ids: list[str], **values):
+        if not video_ids:
+            return
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(
+                    update(CrawlJob)
+                    .where(CrawlJob.video_id.in_(video_ids), CrawlJob.lease_owner == self.owner)
+                    .values(updated_at=func.now(), **values)
+                    .execution_options(synchronize_session=False)
+                )
+
+    async def set_status(self, video_id: str, status: JobStatus):
+        """Avanza de etapa y renueva el lease."""
+        await self._update_owned([video_id], status=status.value, lease_expires=self._lease())
+
+    async def complete(self, video_ids: list[str]):
+        await self._update_owned(list(video_ids), status=JobStatus.done.value, lease_owner=None,
+                                 lease_expires=None, last_error=None, next_attempt_at=None)
+
+    async def fail(self, video_id: str, error: str, retry: bool = True):
+        """Fallo: reintento con backoff, o definitivo si retry=False o se agotaron los intentos."""
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                job = await session.get(CrawlJob, video_id, with_for_update=True)
+                if not job or job.lease_owner != self.owner:
+                    return
+                job.status = JobStatus.failed.value
+                job.last_error = str(error)[:500]
+                job.lease_owner = None
+                job.lease_expires = None
+                if retry and job.attempts < JOB_MAX_ATTEMPTS:
+                    job.next_attempt_at = func.now() + timedelta(seconds=backoff_seconds(job.attempts))
+                else:
+                    job.next_attempt_at = None
+
+    async def release(self, video_ids: list[str]):
+        """
+        Devuelve a la cola lo reservado que sigue activo al acabar la tanda.
+        Lo que no llegó a empezar (STOP) no gasta intento; lo que se quedó a
+        medias sí, para que un video que tumba el proceso no se reintente sin fin.
+        """
+        if not video_ids:
+            return 0
+        owned = and_(CrawlJob.video_id.in_(video_ids), CrawlJob.lease_owner == self.owner)
+        freed = dict(lease_owner=None, lease_expires=None, updated_at=func.now())
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                unstarted = await session.execute(
+                    update(CrawlJob)
+                    .where(owned, CrawlJob.status == JobStatus.claimed.value)
+                    .values(status=JobStatus.queued.value, attempts=CrawlJob.attempts - 1,
+                            next_attempt_at=func.now(), **freed)
+                    .execution_options(synchronize_session=False)
+                )
+                started = await session.execute(
+                    update(CrawlJob)
+                    .where(owned, CrawlJob.status.in_(STARTED))
+                    .values(status=JobStatus.failed.value, last_error="interrupted",
+                            next_attempt_at=case(
+                                (CrawlJob.attempts < JOB_MAX_ATTEMPTS, func.now()), else_=None),
+                            **freed)
+                    .execution_options(synchronize_session=False)
+                )
+                return unstarted.rowcount + started.rowcount
+
+    async def keep_alive(self):
+        """Renueva los leases de este proceso mientras viva (lanzar como tarea)."""
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                async with AsyncSessionLocal() as session:
+                    async with session.begin():
+                        await session.execute(
+                            update(CrawlJob)
+                            .where(CrawlJob.lease_owner == self.owner, CrawlJob.status.in_(ACTIVE))
+                            .values(lease_expires=self._lease())
+                            .execution_options(synchronize_session=False)
+                        )
+            except Exception as e:
+                print(f"⚠️ No se pudieron renovar los leases: {str(e)[:80]}")
+
+    async def stats(self) -> dict:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(CrawlJob.status, func.count()).group_by(CrawlJob.status)
+            )
+            return {status: count for status, count in result}
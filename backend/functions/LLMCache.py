@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ==========================================
+# 🗃️ CACHÉ LOCAL DE RESPUESTAS DEL LLM (SQLite)
+# ==========================================
+# Clave = sha256(modelo + versión del prompt + prompt renderizado). El prompt
+# renderizado ya contiene la transcripción y las listas de etiquetas, así que
+# cualquier cambio en la plantilla o en los datos da una clave nueva y las
+# entradas viejas se van por LRU. Reprocesar un video (crash, re-crawl,
+# reset de la DB) no vuelve a gastar llamadas a Groq.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "Data/llm_cache.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+
+
+def cache_key(model: str, prompt_version: str, prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "tokens_saved": 0, "stored": 0, "evicted": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")   # Varios procesos del crawler a la vez
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    total_tokens INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_lru ON llm_cache (last_used_at)")
+            self._conn = conn
+        return self._conn
+
+    # --- Operaciones síncronas (se ejecutan en un hilo) ---
+
+    def _get(self, key: str):
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, total_tokens FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        self.stats["hits"] += 1
+        self.stats["tokens_saved"] += row[1] or 0
+        return json.loads(row[0])
+
+    def _put(self, key: str, model: str, prompt_version: str, response: dict, total_tokens: int):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_version, json.dumps(response, ensure_ascii=False), total_tokens, now, now),
+            )
+            # Límite de tamaño: fuera las menos usadas recientemente
+            overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_used_at LIMIT ?)", (overflow,)
+                )
+                self.stats["evicted"] += overflow
+            conn.commit()
+        self.stats["stored"] += 1
+
+    # --- API asíncrona ---
+
+    async def get(self, key: str):
+        if not LLM_CACHE_ENABLED:
+            return None
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except sqlite3.Error as e:
+            print(f"⚠️ Caché LLM no disponible: {e}")
+            return None
+
+    async def put(self, key: str, model: str, prompt_version: str, response: dict, total_tokens: int = 0):
+        if not LLM_CACHE_ENABLED:
+            return
+        try:
+            await asyncio.to_thread(self._put, key, model, prompt_version, response, total_tokens)
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo guardar en la caché LLM: {e}")
+
+    def report(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0}
+
+
+llm_cache = LLMCache()
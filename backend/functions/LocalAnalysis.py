@@ -0,0 +1,143 @@
+import json
+import os
+import re
+
+import numpy as np
+
+# Dependencia opcional: frecuencias de palabras (si no, Data/word_zipf.json)
+try:
+    from wordfreq import zipf_frequency
+except ImportError:
+    zipf_frequency = None
+
+# ==========================================
+# 📐 ANÁLISIS LOCAL (sin LLM)
+# ==========================================
+# Dificultad léxica y CEFR estimados con bandas de frecuencia (escala Zipf:
+# 7 = "the", 3 = palabra poco común, 0 = desconocida), todo vectorizado con
+# NumPy sobre los tokens de la transcripción. La medida principal es el
+# percentil 5 de Zipf de los tokens: la rareza que hay que dominar para
+# entender el 95% del texto (cobertura léxica).
+#
+# LOCAL_ANALYSIS_MODE:
+#   off      -> todo lo decide el LLM (como antes)
+#   shadow   -> se calcula y se guarda al lado, pero manda el LLM
+#   residual -> si el CEFR local es claro, el LLM no decide nivel ni wpm
+#               (prompt y respuesta más cortos); sus candidatos de vocabulario
+#               van en el mensaje para que solo los defina
+#   skip     -> como residual, y además los videos claros no llaman al LLM
+#               (sin temas ni resumen: solo para cuando no hay cuota)
+# Por defecto shadow: los umbrales CEFR se ajustaron y se midieron con las
+# mismas 5 filas del volcado (80% de acuerdo dentro de la muestra, no es
+# una validación). residual/skip solo cuando check_local_analysis.py dé un
+# acuerdo suficiente sobre un conjunto aparte, no usado para calibrar.
+LOCAL_ANALYSIS_MODE = os.getenv("LOCAL_ANALYSIS_MODE", "shadow")
+WORD_ZIPF_PATH = os.getenv("WORD_ZIPF_PATH", "Data/word_zipf.json")
+LOCAL_MIN_TOKENS = 300          # Menos palabras: no hay estimación fiable
+LOCAL_CLEAR_MARGIN = 0.15       # Distancia mínima (Zipf) al umbral vecino para ser "claro"
+CANDIDATE_TERMS = 15
+
+# Umbrales sobre el percentil 5 de Zipf (de más fácil a más difícil), ajustados
+# con check_local_analysis.py sobre el volcado del catálogo (provisionales,
+# ver LOCAL_ANALYSIS_MODE)
+CEFR_LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+CEFR_P5_THRESHOLDS = np.array([5.0, 4.6, 4.2, 3.6, 3.0])    # >= A1, A2, B1, B2, C1; si no C2
+BAND_EDGES = np.array([3.0, 4.0, 5.0])                        # rara | poco común | común | muy común
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+local_stats = {"videos": 0, "clear": 0, "skipped_calls": 0, "residual_calls": 0, "tokens_saved": 0}
+
+
+def _load_table() -> dict | None:
+    if not os.path.exists(WORD_ZIPF_PATH):
+        return None
+    with open(WORD_ZIPF_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ZipfLookup:
+    """Zipf por palabra: wordfreq si está instalado, si no la tabla JSON."""
+
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self.table = None if zipf_frequency else _load_table()
+        self._memo: dict[str, float] = {}
+
+    @property
+    def available(self) -> bool:
+        return zipf_frequency is not None or self.table is not None
+
+    def __call__(self, words) -> np.ndarray:
+        values = np.empty(len(words), dtype=np.float32)
+        for i, word in enumerate(words):
+            value = self._memo.get(word)
+            if value is None:
+                value = zipf_frequency(word, self.language) if zipf_frequency else self.table.get(word, 0.0)
+                self._memo[word] = value
+            values[i] = value
+        return values
+
+
+zipf_lookup = ZipfLookup()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def analyze_transcript(text: str, wpm: int | None = None) -> dict | None:
+    """Métricas locales de la transcripción, o None si no hay tabla de frecuencias."""
+    if not zipf_lookup.available:
+        return None
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+
+    # Cada palabra distinta se busca una vez; el resto es aritmética de arrays
+    uniques, inverse, counts = np.unique(np.array(tokens), return_inverse=True, return_counts=True)
+    unique_zipf = zipf_lookup(uniques.tolist())
+    token_zipf = unique_zipf[inverse]
+    known = token_zipf > 0      # Zipf 0 = nombres propios, marcas, errores del ASR
+    if not known.any():
+        return None
+    zipf = token_zipf[known]
+
+    p5 = float(np.percentile(zipf, 5))
+    level_index = int(np.sum(p5 < CEFR_P5_THRESHOLDS))
+    margin = float(np.min(np.abs(CEFR_P5_THRESHOLDS - p5)))
+    bands = np.bincount(np.digitize(zipf, BAND_EDGES), minlength=len(BAND_EDGES) + 1) / zipf.size
+
+    # Candidatas: palabras reales poco frecuentes, priorizando las repetidas
+    rare = (unique_zipf >= 1.5) & (unique_zipf < 3.5)
+    scores = counts[rare] * (4.0 - unique_zipf[rare])
+    order = np.argsort(-scores, kind="stable")[:CANDIDATE_TERMS]
+    candidates = uniques[rare][order].tolist()
+
+    return {
+        "tokens": len(tokens),
+        "types": int(uniques.size),
+        "type_token_ratio": round(uniques.size / len(tokens), 3),
+        "zipf_p5": round(p5, 2),
+        "zipf_mean": round(float(zipf.mean()), 2),
+        "band_shares": [round(float(b), 3) for b in bands[::-1]],   # muy común -> rara
+        "difficulty": round(float(np.clip((6.0 - p5) / 4.0, 0.0, 1.0)) * 100, 1),
+        "cefr_estimate": CEFR_LEVELS[level_index],
+        "clear": len(tokens) >= LOCAL_MIN_TOKENS and margin >= LOCAL_CLEAR_MARGIN,
+        "candidate_vocabulary": candidates,
+        "wpm": wpm,
+    }
+
+
+def local_result(local: dict) -> dict:
+    """Paquete ai_analysis mínimo sin LLM (modo skip)."""
+    return {
+        "transcript_summary": None,
+        "level": local["cefr_estimate"],
+        "topics": [],
+        "accents": [],
+        "content_types": [],
+        "wpm_estimate": local["wpm"],
+        "vocabulary": [{"term": term, "definition": None} for term in local["candidate_vocabulary"]],
+        "grammar_stats": {},
+    }
@@ -1,10 +1,12 @@
+import abc
 import logging
-import time      # <--- Módulo correcto para dormir
-import random    # <--- Para el tiempo aleatorio
+import json
+import os
 import re
 import asyncio
-from seleniumbase import SB
-import yt_dlp
+import urllib.request
+from functions.BrowserPool import BrowserPool
+from functions.Rates import video_rate
 
 # --- CONFIGURACIÓN DE LOGS LIMPIA ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s', datefmt='%H:%M:%S')
@@ -23,9 +25,143 @@ logging.getLogger('yt_dlp').setLevel(logging.ERROR)
 TARGET_LANGUAGE = "en"
 # ==========================================
 
+# ==========================================
+# 📝 FUENTES DE TRANSCRIPCIÓN
+# ==========================================
+# Orden en que se prueban. "http": pistas de subtítulos (json3/timedtext) vía
+# yt-dlp, sin navegador. "browser": panel "Show transcript" con Selenium.
+TRANSCRIPT_SOURCES = [s.strip() for s in os.getenv("TRANSCRIPT_SOURCES", "http,browser").split(",") if s.strip()]
+HTTP_TIMEOUT = 15
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+
+def _youtube_dl(opts: dict):
+    # Import diferido: la ruta con grabaciones (tests) no necesita yt-dlp
+    import yt_dlp
+    return yt_dlp.YoutubeDL(opts)
+
+
+def fetch_video_info(url: str) -> dict:
+    """Metadatos del video (título, canal, duración, pistas) sin descargar nada."""
+    opts = {'quiet': True, 'skip_download': True, 'no_warnings': True}
+    with _youtube_dl(opts) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def fetch_json(url: str) -> dict:
+    request = urllib.request.Request(url, headers={"User-Agent": HTTP_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def select_caption_track(info: dict, language: str):
+    """
+    Devuelve (url_json3, subtitle_source) de la mejor pista del idioma:
+    primero subtítulos manuales, luego los automáticos. Se descartan las
+    traducciones automáticas (tlang=).
+    """
+    for sub_source, key in (("manual", "subtitles"), ("generated", "automatic_captions")):
+        tracks = info.get(key) or {}
+        candidates = [language, f"{language}-orig"] + sorted(k for k in tracks if k.startswith(language + "-"))
+        for lang in candidates:
+            for fmt in tracks.get(lang) or []:
+                if fmt.get("ext") == "json3" and "tlang=" not in fmt.get("url", ""):
+                    return fmt["url"], sub_source
+    return None
+
+
+def parse_json3(payload: dict, clean_regex) -> list[dict]:
+    """Eventos json3 -> [{"start": segundos, "text": ...}] como el scraper."""
+    segments = []
+    for event in payload.get("events", []):
+        segs = event.get("segs")
+        if not segs:
+            continue
+        text = re.sub(clean_regex, "", "".join(seg.get("utf8", "") for seg in segs)).replace("\n", " ").strip()
+        if text:
+            segments.append({"start": int(event.get("tStartMs", 0) // 1000), "text": text})
+    return segments
+
+
+class TranscriptSource(abc.ABC):
+    """Fuente de transcripción: fetch(url) devuelve el paquete de metadatos o None."""
+    name = "base"
+
+    def __init__(self, extractor: "VideoMetadataExtractor"):
+        self.extractor = extractor
+
+    @abc.abstractmethod
+    def fetch(self, url: str):
+        ...
+
+
+class HttpTranscriptSource(TranscriptSource):
+    name = "http"
+
+    def __init__(self, extractor, info_fetcher=fetch_video_info, caption_fetcher=fetch_json):
+        super().__init__(extractor)
+        # Inyectables para reproducir respuestas grabadas (Data/fixtures/transcripts)
+        self.info_fetcher = info_fetcher
+        self.caption_fetcher = caption_fetcher
+
+    def fetch(self, url: str):
+        info = self.info_fetcher(url)
+        track = select_caption_track(info, TARGET_LANGUAGE)
+        if not track:
+            return None
+        caption_url, sub_source = track
+        segments = parse_json3(self.caption_fetcher(caption_url), self.extractor.clean_regex)
+        if not segments:
+            return None
+        logger.info(f"📝 Transcripción HTTP ({sub_source}): {len(segments)} líneas.")
+        return self.extractor._build_result(
+            info["id"], url, info.get("title") or "Unknown",
+            info.get("channel") or info.get("uploader") or "Unknown",
+            int(info.get("duration") or 0), segments, sub_source,
+        )
+
+
+class BrowserTranscriptSource(TranscriptSource):
+    name = "browser"
+
+    def fetch(self, url: str):
+        return self.extractor._scrape_sync(url)
+
+
+SOURCE_CLASSES = {"http": HttpTranscriptSource, "browser": BrowserTranscriptSource}
+
+FIXTURES_DIR = os.path.join("Data", "fixtures", "transcripts")
+
+
+def fixture_http_source(extractor, fixtures_dir: str = FIXTURES_DIR) -> HttpTranscriptSource:
+    """
+    HttpTranscriptSource que responde con grabaciones locales
+    (<video_id>.info.json y <video_id>.json3) en lugar de ir a YouTube.
+    """
+    def load_info(url):
+        video_id = url.split("v=")[-1].split("&")[0]
+        with open(os.path.join(fixtures_dir, f"{video_id}.info.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_caption(caption_url):
+        video_id = caption_url.split("v=")[-1].split("&")[0]
+        with open(os.path.join(fixtures_dir, f"{video_id}.json3"), encoding="utf-8") as f:
+            return json.load(f)
+
+    return HttpTranscriptSource(extractor, info_fetcher=load_info, caption_fetcher=load_caption)
+
+
 class VideoMetadataExtractor:
-    def __init__(self):
+    def __init__(self, browser_pool: BrowserPool | None = None, sources: list[TranscriptSource] | None = None):
         self.clean_regex = re.compile(r"\[.*?\]|\(.*?\)")
+        # Los navegadores se crean bajo demanda y se reutilizan entre videos
+        self.browser_pool = browser_pool or BrowserPool(locale=TARGET_LANGUAGE)
+        self.sources = sources or [SOURCE_CLASSES[name](self) for name in TRANSCRIPT_SOURCES]
+        self.source_stats: dict[str, int] = {}
+
+    def close(self):
+        """Cierra los navegadores abiertos del pool."""
+        self.browser_pool.close()
 
     def _calculate_wpm(self, word_count: int, duration_seconds: float) -> int:
         if duration_seconds <= 0: return 0
@@ -62,29 +198,15 @@ class VideoMetadataExtractor:
         else:
             video_id = url.split("/")[-1]
         
-        with SB(uc=True, test=True, headless=True, locale_code=TARGET_LANGUAGE) as sb:
+        with self.browser_pool.session() as browser:
+            sb = browser.sb
             try:
-                wait = random.uniform(4, 7)
-                time.sleep(wait)
-                
-                logger.info(f"▶️ Procesando ({TARGET_LANGUAGE}): {video_id}...")
+                logger.info(f"▶️ Procesando ({TARGET_LANGUAGE}): {video_id}... [navegador #{browser.session_id}]")
                 
-                sb.maximize_window()
-                sb.activate_cdp_mode(url)
+                browser.open(url)
                 
-                # --- COOKIES ---
-                sb.sleep(2)
-                cookie_selectors = [
-                    'button[aria-label*="Rechazar"]', 'button:contains("Rechazar")', 
-                    'button[aria-label*="Reject"]', 'button:contains("Reject")',    
-                    'form[action*="consent"] button',
-                    'ytd-consent-bump-v2-lightbox button'
-                ]
-                for selector in cookie_selectors:
-                    if sb.is_element_visible(selector):
-                        sb.click(selector)
-                        sb.sleep(1)
-                        break
+                # --- COOKIES (solo la primera página de cada sesión) ---
+                browser.handle_consent()
 
                 if not sb.wait_for_element("#columns", timeout=20):
                     logger.warning(f"⚠️ Timeout cargando video: {video_id}")
@@ -103,9 +225,7 @@ class VideoMetadataExtractor:
                 try:
                     dur_str = sb.get_text(".ytp-time-duration")
                     duration = self._parse_duration(dur_str)
-                except: duration = 600
-
-                thumbnail = f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
+                except: duration = 0   # Sin duración: el wpm sale de la línea de tiempo
 
                 # --- TRANSCRIPCIÓN ---
                 transcript_text = ""
@@ -207,35 +327,63 @@ class VideoMetadataExtractor:
                     logger.warning(f"❌ Sin subtítulos (o no se pudieron extraer): {title[:30]}...")
                     return None
 
-                # Métricas
-                word_count = len(transcript_text.split())
-                wpm = self._calculate_wpm(word_count, duration)
-
-                logger.info(f"✅ OK: {title[:40]}... | 🗣️ {channel} | ⚡ {wpm} WPM")
-
-                data = {
-                    "video_id": video_id,
-                    "url": url,
-                    "title": title,
-                    "channel": channel,
-                    "duration_seconds": duration,
-                    "thumbnail": thumbnail,
-                    "wpm": wpm,
-                    "subtitle_source": sub_source,
-                    "transcript_full": transcript_text,
-                    "transcript_json": transcript_structured,               
-                    "language": TARGET_LANGUAGE, 
-                    "accents": []                
-                }
+                data = self._build_result(video_id, url, title, channel, duration, transcript_structured, sub_source)
 
             except Exception as e:
                 logger.error(f"❌ Error en {video_id}: {str(e)[:50]}...")
+                # Estado del navegador desconocido: se recicla al devolverlo
+                browser.broken = True
                 return None
         
         return data
+
+    def _build_result(self, video_id, url, title, channel, duration, segments, sub_source) -> dict:
+        """Paquete común de metadatos: misma forma sirva la ruta HTTP o el navegador."""
+        transcript_text = " ".join(seg["text"] for seg in segments)
+
+        # Métricas: wpm por la línea de tiempo de los segmentos; la duración
+        # del reproductor solo si la transcripción es demasiado corta
+        wpm, profile = video_rate(segments)
+        if wpm is None:
+            wpm = self._calculate_wpm(len(transcript_text.split()), duration)
+
+        logger.info(f"✅ OK: {title[:40]}... | 🗣️ {channel} | ⚡ {wpm} WPM")
+
+        return {
+            "video_id": video_id,
+            "url": url,
+            "title": title,
+            "channel": channel,
+            "duration_seconds": duration,
+            "thumbnail": f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+            "wpm": wpm,
+            "rate_profile": profile,
+            "subtitle_source": sub_source,
+            "transcript_full": transcript_text,
+            "transcript_json": segments,               
+            "language": TARGET_LANGUAGE, 
+            "accents": []                
+        }
+
+    def _fetch_sync(self, url: str):
+        """Prueba las fuentes en orden y anota cuál sirvió el video."""
+        for source in self.sources:
+            try:
+                data = source.fetch(url)
+            except Exception as e:
+                logger.warning(f"⚠️ Fuente '{source.name}' falló: {str(e)[:80]}")
+                data = None
+            if data:
+                data["transcript_path"] = source.name
+                self.source_stats[source.name] = self.source_stats.get(source.name, 0) + 1
+                return data
+            logger.info(f"↪️ Fuente '{source.name}' sin transcripción, probando la siguiente...")
+        self.source_stats["failed"] = self.source_stats.get("failed", 0) + 1
+        return None
+
     async def process_video(self, url: str):
         try:
-            return await asyncio.to_thread(self._scrape_sync, url)
+            return await asyncio.to_thread(self._fetch_sync, url)
         except Exception as e:
             logger.error(f"Error thread: {e}")
             return None
@@ -244,7 +392,7 @@ class VideoMetadataExtractor:
 def get_videos_from_playlist(playlist_url: str):
     opts = {'extract_flat': True, 'quiet': True, 'skip_download': True}
     urls = []
-    with yt_dlp.YoutubeDL(opts) as ydl:
+    with _youtube_dl(opts) as ydl:
         try:
             res = ydl.extract_info(playlist_url, download=False)
             if 'entries' in res:
@@ -254,14 +402,27 @@ def get_videos_from_playlist(playlist_url: str):
         except: pass
     return urls
 
+def get_playlist_window(playlist_url: str, start: int, end: int):
+    """
+    Enumera solo las posiciones [start, end] (1-indexadas) de la playlist.
+    Retorna: (lista de (posición, video_id), total de la playlist o None)
+    """
+    opts = {'extract_flat': True, 'quiet': True, 'skip_download': True,
+            'playliststart': start, 'playlistend': end}
+    with _youtube_dl(opts) as ydl:
+        res = ydl.extract_info(playlist_url, download=False) or {}
+    entries = [e for e in (res.get('entries') or []) if e and e.get('id')]
+    return [(start + i, e['id']) for i, e in enumerate(entries)], res.get('playlist_count')
+
 def get_videos_from_channel(channel_url, limit=10):
     opts = {'extract_flat': True, 'quiet': True, 'skip_download': True, 'playlistend': limit}
     urls = []
-    with yt_dlp.YoutubeDL(opts) as ydl:
+    with _youtube_dl(opts) as ydl:
         try:
             res = ydl.extract_info(channel_url, download=False)
             if 'entries' in res:
                 for entry in res['entries']:
                      urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
         except: pass
-    return urls
\ No newline at end of file
+    return urls
+
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+
+from functions.Filters import filter_catalog
+
+# ==========================================
+# 🧾 PLANTILLA DE PROMPT VERSIONADA
+# ==========================================
+# El mensaje system (rol, restricciones y estructura JSON) se compila una vez
+# por versión del catálogo de filtros y es idéntico byte a byte entre
+# llamadas: el proveedor puede reutilizar ese prefijo (prompt caching). La
+# transcripción va en el mensaje user. template.id = versión + huella del
+# system, se guarda en ai_analysis.prompt_version para saber qué prompt
+# produjo cada análisis. Subir PROMPT_VERSION al cambiar el texto o el
+# formato de la respuesta.
+PROMPT_VERSION = "v2"
+
+# --- JSON ESTRUCTURA SIMPLIFICADA (SIN summary NI functional_use) ---
+JSON_STRUCTURE = {
+    "transcript_summary": "Detailed summary (max 500 chars) (ENGLISH).",
+    "level": "One value from list.",
+    "topics": ["Tag1", "Tag2", "Tag3"],
+    "accents": ["US", "British"],
+    "content_types": ["Type1"],
+    "wpm_estimate": 150,
+    "vocabulary": [{ "term": "Word", "definition": "Short definition in English." }],
+    "grammar_stats": { "subjunctive": "Low", "past_tense": "Medium", "future_tense": "Low", "connectors": "High" }
+}
+
+SYSTEM_TEMPLATE = """Role: Expert English linguist.
+Task: Extract metadata from the video transcript sent by the user. ALL OUTPUT MUST BE IN ENGLISH.
+
+CONSTRAINTS:
+{constraints}
+
+OUTPUT JSON STRUCTURE:
+{structure}"""
+
+# Modo residual: nivel y wpm ya los calcula functions/LocalAnalysis
+RESIDUAL_FIELDS = ("level", "wpm_estimate")
+RESIDUAL_VOCABULARY_RULE = "VOCABULARY: Define the CANDIDATE VOCABULARY terms given by the user (skip any that are not useful for learners)."
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    version: str
+    system: str          # Prefijo constante (mensaje system)
+    fingerprint: str     # sha256 del system
+
+    @property
+    def id(self) -> str:
+        return f"{self.version}:{self.fingerprint[:10]}"
+
+    @classmethod
+    def compile(cls, tags, levels, types, version: str = PROMPT_VERSION, residual: bool = False) -> "PromptTemplate":
+        tags_str = ", ".join(f'"{t}"' for t in tags) if tags else "Technology, Business"
+        levels_str = ", ".join(f'"{l}"' for l in levels) if levels else "B1, B2"
+        types_str = ", ".join(f'"{t}"' for t in types) if types else "General"
+        rules = [
+            f"LEVEL: [{levels_str}]",
+            f"TOPICS: Choose 3 from [{tags_str}]",
+            f"CONTENT_TYPES: Choose from [{types_str}]",
+            "ACCENTS: Infer list based on context.",
+        ]
+        structure = dict(JSON_STRUCTURE)
+        if residual:
+            rules = rules[1:] + [RESIDUAL_VOCABULARY_RULE]
+            for field in RESIDUAL_FIELDS:
+                structure.pop(field)
+        system = SYSTEM_TEMPLATE.format(
+            constraints="\n".join(f"{i}. {rule}" for i, rule in enumerate(rules, 1)),
+            structure=json.dumps(structure),
+        )
+        return cls(version, system, hashlib.sha256(system.encode("utf-8")).hexdigest())
+
+    def user_message(self, transcript_text: str, context: str = "", candidates: list[str] | None = None) -> str:
+        vocabulary = f"CANDIDATE VOCABULARY: {', '.join(candidates)}\n\n" if candidates else ""
+        return f'{context}{vocabulary}TRANSCRIPT:\n"{transcript_text}"'
+
+
+_compiled: dict[bool, tuple[str, PromptTemplate]] = {}
+_compile_lock = threading.Lock()
+
+
+def get_template(residual: bool = False) -> PromptTemplate:
+    """Plantilla compilada; solo se recompila si cambian los JSON de filtros."""
+    snapshot = filter_catalog.get()
+    compiled = _compiled.get(residual)
+    if compiled is not None and compiled[0] == snapshot.etag:
+        return compiled[1]
+    with _compile_lock:
+        data = snapshot.data
+        template = PromptTemplate.compile(data["topics"], data["levels"], data["content_types"], residual=residual)
+        _compiled[residual] = (snapshot.etag, template)
+        return template
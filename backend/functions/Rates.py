@@ -0,0 +1,103 @@
+from itertools import chain
+
+import numpy as np
+
+# ==========================================
+# 🗣️ VELOCIDAD DE HABLA DESDE LA LÍNEA DE TIEMPO
+# ==========================================
+# El wpm se calcula con los tiempos de transcript_json, no con la duración
+# del reproductor (que a veces no se lee y antes caía a 600 s). Cada segmento
+# dura hasta el inicio del siguiente, recortado a SEGMENT_MAX_SECONDS para
+# que música o silencios largos no cuenten como habla. Todo va vectorizado:
+# un lote de videos se aplana en arrays y se agrega con reduceat/bincount.
+SEGMENT_MAX_SECONDS = 12.0
+PROFILE_BINS = 10                 # Tramos del perfil de velocidad por video
+MIN_WORDS = 50                    # Menos: no hay wpm fiable
+MIN_SPEECH_SECONDS = 20.0
+
+
+def flatten(starts_list: list, words_list: list):
+    """Listas por video -> arrays planos + offsets de inicio de cada video."""
+    lengths = np.fromiter(map(len, starts_list), dtype=np.int64, count=len(starts_list))
+    total = int(lengths.sum())
+    starts = np.fromiter(chain.from_iterable(starts_list), dtype=np.float64, count=total)
+    words = np.fromiter(chain.from_iterable(words_list), dtype=np.float64, count=total)
+    return starts, words, lengths
+
+
+def compute_rates(starts: np.ndarray, words: np.ndarray, lengths: np.ndarray, bins: int = PROFILE_BINS):
+    """
+    Retorna (wpm[n] con NaN si no es fiable, perfiles[n, bins] en wpm,
+    segundos de habla[n]) para n videos aplanados.
+    """
+    n = lengths.size
+    wpm = np.full(n, np.nan)
+    profiles = np.full((n, bins), np.nan)
+    speech = np.zeros(n)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return wpm, profiles, speech
+
+    video = np.repeat(np.arange(n), lengths)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    last = offsets[nonempty] + lengths[nonempty] - 1
+
+    # Duración de cada segmento = hasta el siguiente del mismo video
+    duration = np.empty_like(starts)
+    duration[:-1] = np.diff(starts)
+    duration[last] = np.nan
+    duration = np.clip(duration, 0.0, SEGMENT_MAX_SECONDS)
+
+    # Último segmento de cada video: segundos por palabra medios de ese video
+    timed = ~np.isnan(duration)
+    secs = np.bincount(video, weights=np.where(timed, duration, 0.0), minlength=n)
+    timed_words = np.bincount(video, weights=np.where(timed, words, 0.0), minlength=n)
+    sec_per_word = np.divide(secs, timed_words, out=np.full(n, 0.4), where=timed_words > 0)
+    duration[last] = np.minimum(words[last] * sec_per_word[video[last]], SEGMENT_MAX_SECONDS)
+
+    total_words = np.bincount(video, weights=words, minlength=n)
+    speech = np.bincount(video, weights=duration, minlength=n)
+    reliable = (total_words >= MIN_WORDS) & (speech >= MIN_SPEECH_SECONDS)
+    wpm[reliable] = total_words[reliable] / (speech[reliable] / 60.0)
+
+    # Perfil: tramos iguales de la línea de tiempo de cada video
+    first = starts[offsets[nonempty]]
+    span = np.zeros(n)
+    origin = np.zeros(n)
+    span[nonempty] = starts[last] + duration[last] - first
+    origin[nonempty] = first
+    position = (starts - origin[video]) / np.maximum(span[video], 1e-9)
+    slot = video * bins + np.minimum((position * bins).astype(np.int64), bins - 1)
+    bin_words = np.bincount(slot, weights=words, minlength=n * bins).reshape(n, bins)
+    bin_secs = np.bincount(slot, weights=duration, minlength=n * bins).reshape(n, bins)
+    np.divide(bin_words * 60.0, bin_secs, out=profiles, where=bin_secs > 0)
+    profiles[~reliable] = np.nan
+    return wpm, profiles, speech
+
+
+def rate_profile(wpm: float, profile: np.ndarray, speech_seconds: float) -> dict:
+    """Perfil compacto para la columna rate_profile."""
+    values = profile[~np.isnan(profile)]
+    return {
+        "wpm": int(round(wpm)),
+        "bins": [None if np.isnan(v) else int(round(v)) for v in profile],
+        "p10": int(round(np.percentile(values, 10))) if values.size else None,
+        "p50": int(round(np.percentile(values, 50))) if values.size else None,
+        "p90": int(round(np.percentile(values, 90))) if values.size else None,
+        "speech_seconds": int(round(speech_seconds)),
+    }
+
+
+def segment_word_counts(segments: list[dict]) -> list[int]:
+    return [len((seg.get("text") or "").split()) for seg in segments]
+
+
+def video_rate(segments: list[dict]):
+    """Un solo video (scraper): (wpm | None, rate_profile | None)."""
+    if not segments:
+        return None, None
+    starts, words, lengths = flatten([[seg.get("start", 0) for seg in segments]], [segment_word_counts(segments)])
+    wpm, profiles, speech = compute_rates(starts, words, lengths)
+    if np.isnan(wpm[0]):
+        return None, None
+    return int(round(wpm[0])), rate_profile(wpm[0], profiles[0], speech[0])
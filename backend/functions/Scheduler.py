@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+# ==========================================
+# ⏱️ PLANIFICADOR ASÍNCRONO DEL PILOTO AUTOMÁTICO
+# ==========================================
+# Nunca bloquea el event loop: los descansos son asyncio.wait con timeout.
+# Cada playlist tiene su propio enfriamiento y un presupuesto global de
+# videos por ventana de tiempo protege la IP. Mientras una playlist descansa,
+# otra puede trabajar.
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+@dataclass
+class ScheduleConfig:
+    hours: float = 2.0                   # Duración total del turno
+    batch_size: int = 50                 # Videos máx. por tanda de una playlist
+    playlist_cooldown_min: float = 15.0  # Descanso de una playlist tras trabajar
+    idle_cooldown_min: float = 30.0      # Descanso de una playlist sin videos nuevos
+    ip_budget: int = 50                  # Videos máx. por ventana (todas las playlists)
+    ip_window_min: float = 15.0
+    parallel_playlists: int = 2          # Playlists en curso a la vez
+    retry_seconds: float = 30.0          # Reintento tras error en una tanda
+
+    @classmethod
+    def from_env(cls) -> "ScheduleConfig":
+        return cls(
+            hours=_env_float("AUTOPILOT_HOURS", cls.hours),
+            batch_size=int(_env_float("AUTOPILOT_BATCH_SIZE", cls.batch_size)),
+            playlist_cooldown_min=_env_float("AUTOPILOT_PLAYLIST_COOLDOWN_MIN", cls.playlist_cooldown_min),
+            idle_cooldown_min=_env_float("AUTOPILOT_IDLE_COOLDOWN_MIN", cls.idle_cooldown_min),
+            ip_budget=int(_env_float("AUTOPILOT_IP_BUDGET", cls.ip_budget)),
+            ip_window_min=_env_float("AUTOPILOT_IP_WINDOW_MIN", cls.ip_window_min),
+            parallel_playlists=int(_env_float("AUTOPILOT_PARALLEL_PLAYLISTS", cls.parallel_playlists)),
+            retry_seconds=_env_float("AUTOPILOT_RETRY_SECONDS", cls.retry_seconds),
+        )
+
+
+class IpBudget:
+    """Ventana deslizante: como mucho `budget` videos cada `window` segundos."""
+
+    def __init__(self, budget: int, window_seconds: float):
+        self.budget = budget
+        self.window = window_seconds
+        self._spent: deque[tuple[float, int]] = deque()
+
+    def _trim(self, now: float):
+        while self._spent and now - self._spent[0][0] >= self.window:
+            self._spent.popleft()
+
+    def available(self) -> int:
+        now = time.monotonic()
+        self._trim(now)
+        return max(self.budget - sum(n for _, n in self._spent), 0)
+
+    def seconds_until_available(self) -> float:
+        if self.available() > 0 or not self._spent:
+            return 0.0
+        return max(self.window - (time.monotonic() - self._spent[0][0]), 0.0)
+
+    def reserve(self, n: int):
+        self._spent.append((time.monotonic(), n))
+
+    def refund(self, n: int):
+        """Devuelve la parte reservada que no se llegó a usar (la más reciente)."""
+        while n > 0 and self._spent:
+            ts, spent = self._spent.pop()
+            if spent > n:
+                self._spent.append((ts, spent - n))
+                return
+            n -= spent
+
+
+BatchRunner = Callable[[str, int, asyncio.Event], Awaitable[int]]
+
+
+class AutopilotScheduler:
+    def __init__(self, run_batch: BatchRunner, load_playlists: Callable[[], list[str]],
+                 config: ScheduleConfig | None = None, state_file: str | None = None):
+        self.run_batch = run_batch          # (playlist, límite, stop_event) -> videos procesados
+        self.load_playlists = load_playlists
+        self.config = config or ScheduleConfig.from_env()
+        self.state_file = state_file
+        self.budget = IpBudget(self.config.ip_budget, self.config.ip_window_min * 60)
+        self.stop_event = asyncio.Event()
+        self.next_ready: dict[str, float] = {}   # playlist -> time.time() en que puede volver
+        self.processed_total = 0
+
+    # --- Estado persistido (los enfriamientos sobreviven a un reinicio) ---
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                playlists = json.load(f).get("playlists", {})
+            for url, info in playlists.items():
+                self.next_ready[url] = datetime.fromisoformat(info["next_ready_at"]).timestamp()
+        except Exception:
+            pass
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        with open(self.state_file, "w") as f:
+            json.dump({
+                "playlists": {
+                    url: {"next_ready_at": datetime.fromtimestamp(ts).isoformat()}
+                    for url, ts in self.next_ready.items()
+                },
+                "last_updated": str(datetime.now())
+            }, f, indent=4)
+
+    # --- Señales ---
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop, sig.name)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Windows: sin add_signal_handler, usamos signal.signal
+                signal.signal(sig, lambda s, f: loop.call_soon_threadsafe(self.request_stop, signal.Signals(s).name))
+
+    def request_stop(self, reason: str = "stop"):
+        if not self.stop_event.is_set():
+            print(f"\n🛑 {reason} recibido: no se empiezan videos nuevos, terminando los que están en curso...")
+            self.stop_event.set()
+
+    # --- Bucle principal ---
+
+    async def _run_playlist(self, playlist: str, limit: int):
+        processed = 0
+        try:
+            processed = await self.run_batch(playlist, limit, self.stop_event)
+            cooldown = self.config.playlist_cooldown_min if processed else self.config.idle_cooldown_min
+            delay = cooldown * 60
+        except Exception as e:
+            print(f"❌ Error en tanda de {playlist[-15:]}: {e}")
+            delay = self.config.retry_seconds
+        finally:
+            self.budget.refund(max(limit - processed, 0))
+        self.processed_total += processed
+        self.next_ready[playlist] = time.time() + delay
+        self._save_state()
+        if processed:
+            print(f"❄️ {playlist[-15:]}: {processed} videos. Descansa {int(delay / 60)} min.")
+
+    async def run(self):
+        self._load_state()
+        self.install_signal_handlers()
+        end_at = time.time() + self.config.hours * 3600
+        running: dict[str, asyncio.Task] = {}
+        stop_waiter = asyncio.create_task(self.stop_event.wait())
+
+        print(f"🛑 Fin programado: {datetime.fromtimestamp(end_at).strftime('%H:%M:%S')}")
+        print(f"📦 Config: {self.config}")
+
+        while not self.stop_event.is_set() and time.time() < end_at:
+            playlists = self.load_playlists()
+            if not playlists:
+                print("⚠️ No hay playlists configuradas.")
+
+            now = time.time()
+            ready = sorted(
+                (p for p in playlists if p not in running and self.next_ready.get(p, 0) <= now),
+                key=lambda p: self.next_ready.get(p, 0),
+            )
+            while ready and len(running) < self.config.parallel_playlists:
+                limit = min(self.config.batch_size, self.budget.available())
+                if limit <= 0:
+                    break
+                playlist = ready.pop(0)
+                self.budget.reserve(limit)
+                print(f"\n📂 Tanda de hasta {limit} videos: {playlist[-15:]}...")
+                running[playlist] = asyncio.create_task(self._run_playlist(playlist, limit))
+
+            # Dormir sin bloquear hasta: fin de una tanda, STOP, próxima playlist o presupuesto
+            waits = [end_at - now, 300.0]
+            pending_ready = [ts - now for p, ts in self.next_ready.items() if p in playlists and p not in running and ts > now]
+            if pending_ready:
+                waits.append(min(pending_ready))
+            if self.budget.available() <= 0:
+                waits.append(self.budget.seconds_until_available())
+            timeout = max(min(waits), 1.0)
+            if not running and timeout > 60:
+                print(f"💤 Nada que hacer. Próxima comprobación en {int(timeout / 60)} min...")
+            await asyncio.wait([stop_waiter, *running.values()], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for playlist in [p for p, t in running.items() if t.done()]:
+                running.pop(playlist)
+
+        # Cierre ordenado: las tandas en curso terminan sus videos en vuelo
+        if running:
+            self.stop_event.set()
+            print(f"⏳ Esperando {len(running)} tanda(s) en curso...")
+            await asyncio.gather(*running.values(), return_exceptions=True)
+        stop_waiter.cancel()
+        self._save_state()
+        return self.processed_total
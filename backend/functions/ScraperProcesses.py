@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+
+logger = logging.getLogger("Scraper")
+
+# ==========================================
+# 🧩 SCRAPER EN VARIOS PROCESOS (SCRAPER_MODE=process)
+# ==========================================
+# Varios SB() en hilos de un mismo proceso se pisan entre sí. Aquí cada
+# proceso hijo tiene su propio navegador (pool de 1), su propio
+# user_data_dir y su locale, y devuelve el resultado por una cola (IPC).
+# Si un Chrome cuelga o tumba su proceso, solo se pierde ese video: el
+# supervisor reinicia el worker y el resto sigue trabajando.
+SCRAPER_PROCESSES = int(os.getenv("SCRAPER_PROCESSES", str(max(1, (os.cpu_count() or 2) // 2))))
+SCRAPER_LOCALES = [s.strip() for s in os.getenv("SCRAPER_LOCALES", "en").split(",") if s.strip()]
+SCRAPER_PROFILE_DIR = os.getenv("SCRAPER_PROFILE_DIR", "Data/browser_profiles")
+SCRAPER_TASK_TIMEOUT = float(os.getenv("SCRAPER_TASK_TIMEOUT", "300"))   # Segundos por video
+SCRAPER_RESTART_DELAY = 2.0
+
+
+def worker_main(index: int, locale: str, user_data_dir: str, inbox, results):
+    """Bucle del proceso hijo: (task_id, url) -> (task_id, index, datos | None)."""
+    # Ctrl+C lo gestiona el padre, que deja terminar el video en curso
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from functions.BrowserPool import BrowserPool
+    from functions.Metadata import VideoMetadataExtractor
+
+    extractor = VideoMetadataExtractor(browser_pool=BrowserPool(size=1, locale=locale, user_data_dir=user_data_dir))
+    try:
+        while True:
+            task = inbox.get()
+            if task is None:
+                break
+            task_id, url = task
+            try:
+                data = extractor._fetch_sync(url)
+            except Exception as e:
+                logger.error(f"❌ Worker {index}: {str(e)[:80]}")
+                data = None
+            results.put((task_id, index, data))
+    finally:
+        extractor.close()
+
+
+class WorkerHandle:
+    def __init__(self, ctx, index: int, locale: str, user_data_dir: str, results):
+        self.index = index
+        self.inbox = ctx.Queue()
+        self.process = ctx.Process(
+            target=worker_main, args=(index, locale, user_data_dir, self.inbox, results),
+            name=f"scraper-{index}", daemon=True,
+        )
+        self.process.start()
+        self.task: tuple[int, asyncio.Future] | None = None   # Video en curso
+        logger.info(f"🧩 Worker de scraping #{index} arrancado (pid {self.process.pid}, {locale}).")
+
+
+class ScraperProcessPool:
+    """Misma interfaz que VideoMetadataExtractor (process_video / source_stats / close)."""
+
+    def __init__(self, workers: int = SCRAPER_PROCESSES, locales: list[str] = SCRAPER_LOCALES,
+                 profile_dir: str = SCRAPER_PROFILE_DIR, task_timeout: float = SCRAPER_TASK_TIMEOUT):
+        self.size = max(1, workers)
+        self.locales = locales or ["en"]
+        self.profile_dir = profile_dir
+        self.task_timeout = task_timeout
+        self.ctx = mp.get_context("spawn")   # Sin fork: Chrome y los hilos no lo toleran
+        self.results = self.ctx.Queue()
+        self.workers: list[WorkerHandle] = []
+        self.source_stats: dict[str, int] = {}
+        self.restarts = 0
+        self._task_ids = itertools.count(1)
+        self._idle: asyncio.Queue | None = None
+        self._loop = None
+        self._monitor: asyncio.Task | None = None
+        self._reader: threading.Thread | None = None
+        self._closing = False
+        self._restarting: set[int] = set()
+
+    def _spawn(self, index: int) -> WorkerHandle:
+        user_data_dir = os.path.abspath(os.path.join(self.profile_dir, f"worker-{index}"))
+        os.makedirs(user_data_dir, exist_ok=True)
+        locale = self.locales[index % len(self.locales)]
+        return WorkerHandle(self.ctx, index, locale, user_data_dir, self.results)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._idle = asyncio.Queue()
+        for index in range(self.size):
+            self.workers.append(self._spawn(index))
+            self._idle.put_nowait(index)
+        self._reader = threading.Thread(target=self._read_results, name="scraper-results", daemon=True)
+        self._reader.start()
+        self._monitor = asyncio.create_task(self._watch_workers())
+
+    # --- IPC: resultados de los hijos ---
+
+    def _read_results(self):
+        while not self._closing:
+            try:
+                task_id, index, data = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, index, task_id, data)
+
+    def _resolve(self, index: int, task_id: int, data):
+        task = self.workers[index].task
+        # Resultados de un worker ya reiniciado se descartan por task_id
+        if task and task[0] == task_id and not task[1].done():
+            task[1].set_result(data)
+
+    # --- Supervisión ---
+
+    async def _restart(self, index: int, reason: str):
+        # El monitor y un timeout pueden detectar el mismo worker caído a la vez
+        if index in self._restarting:
+            return
+        self._restarting.add(index)
+        try:
+            old = self.workers[index]
+            if old.process.is_alive():
+                old.process.terminate()
+            # join() bloquea: en un hilo para no parar el event loop mientras muere
+            await asyncio.to_thread(old.process.join, 5)
+            self.restarts += 1
+            logger.warning(f"🔁 Reiniciando worker #{index} ({reason}). Reinicios totales: {self.restarts}")
+            self.workers[index] = self._spawn(index)
+            # Se libera al que esperaba solo con el nuevo worker ya en su sitio
+            if old.task and not old.task[1].done():
+                old.task[1].set_result(None)
+        finally:
+            self._restarting.discard(index)
+
+    async def _watch_workers(self):
+        while not self._closing:
+            await asyncio.sleep(SCRAPER_RESTART_DELAY)
+            for handle in list(self.workers):
+                if not self._closing and not handle.process.is_alive():
+                    await self._restart(handle.index, f"proceso terminó con código {handle.process.exitcode}")
+
+    # --- API del pipeline ---
+
+    async def process_video(self, url: str):
+        if self._idle is None:
+            await self.start()
+        index = await self._idle.get()
+        try:
+            handle = self.workers[index]
+            future = self._loop.create_future()
+            task_id = next(self._task_ids)
+            handle.task = (task_id, future)
+            handle.inbox.put((task_id, url))
+            try:
+                data = await asyncio.wait_for(asyncio.shield(future), self.task_timeout)
+            except asyncio.TimeoutError:
+                await self._restart(index, f"sin respuesta en {int(self.task_timeout)}s")
+                data = None
+            self.workers[index].task = None
+        finally:
+            self._idle.put_nowait(index)
+
+        key = data.get("transcript_path", "unknown") if data else "failed"
+        self.source_stats[key] = self.source_stats.get(key, 0) + 1
+        return data
+
+    def close(self):
+        """
+        Pide a cada worker que cierre su navegador y espera; mata a los que no
+        respondan. Bloquea hasta 30 s: desde async, con asyncio.to_thread
+        (como VideoMetadataExtractor.close en main_workflow).
+        """
+        self._closing = True
+        if self._monitor is not None:
+            self._loop.call_soon_threadsafe(self._monitor.cancel)
+        for handle in self.workers:
+            try:
+                handle.inbox.put(None)
+            except Exception:
+                pass
+        deadline = time.time() + 30
+        for handle in self.workers:
+            handle.process.join(timeout=max(deadline - time.time(), 0.1))
+            if handle.process.is_alive():
+                handle.process.terminate()
+        logger.info(f"🧩 Workers de scraping cerrados ({self.restarts} reinicios).")
@@ -0,0 +1,73 @@
+from sqlalchemy import cast, func, literal, update
+from sqlalchemy.dialects.postgresql import JSONB, REGCONFIG
+
+from models.video import Video
+
+# ==========================================
+# 🔎 BÚSQUEDA DE TEXTO COMPLETO (tsvector)
+# ==========================================
+# 'simple' no aplica stemming de ningún idioma: el catálogo mezcla en/es/fr/de
+# y así la misma configuración sirve para indexar y para consultar.
+SEARCH_CONFIG = "simple"
+
+def _regconfig():
+    return cast(literal(SEARCH_CONFIG), REGCONFIG)
+
+def _weighted(document, weight: str):
+    return func.setweight(func.to_tsvector(_regconfig(), document), weight)
+
+def search_vector_expr():
+    """
+    Expresión SQL que construye el tsvector a partir de las columnas del propio
+    registro: título (A), términos de ai_analysis.vocabulary (B) y el texto de
+    los segmentos de transcript_json (C).
+    """
+    vocabulary = func.coalesce(
+        func.jsonb_path_query_array(cast(Video.ai_analysis, JSONB), "$.vocabulary[*].term"),
+        cast(literal("[]"), JSONB),
+    )
+    transcript = func.coalesce(
+        func.jsonb_path_query_array(cast(Video.transcript_json, JSONB), "$[*].text"),
+        cast(literal("[]"), JSONB),
+    )
+    return (
+        _weighted(func.coalesce(Video.title, ""), "A")
+        .op("||")(_weighted(vocabulary, "B"))
+        .op("||")(_weighted(transcript, "C"))
+    )
+
+def search_query(text: str):
+    """Convierte la búsqueda del usuario (sintaxis tipo web) en tsquery."""
+    return func.websearch_to_tsquery(_regconfig(), text)
+
+async def refresh_search_vectors(session, video_ids: list[str]):
+    """
+    Recalcula search_vector de los videos indicados dentro de la transacción
+    actual. Se llama desde las escrituras (admin y pipeline), nunca al leer.
+    """
+    if not video_ids:
+        return
+    await session.execute(
+        update(Video)
+        .where(Video.video_id.in_(video_ids))
+        .values(search_vector=search_vector_expr())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_filters(query, level=None, language=None, accent=None, topic=None, content_types=None):
+    """Filtros comunes del listado, la búsqueda y la exportación."""
+    if level:
+        query = query.where(Video.level == level)
+    if language:
+        query = query.where(Video.language == language)
+    
+    # Filtros para Arrays (Postgres): @> aprovecha los índices GIN
+    if accent:
+        # Busca si el acento está contenido en el array accents
+        query = query.where(Video.accents.contains([accent]))
+    if topic:
+        query = query.where(Video.topics.contains([topic]))
+    if content_types:
+        query = query.where(Video.content_types.contains([content_types]))
+    return query
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+# ==========================================
+# 🏭 PIPELINE POR ETAPAS (asyncio + colas acotadas)
+# ==========================================
+# Cada etapa tiene su propio número de workers y una cola de entrada con
+# tamaño máximo: si una etapa se atasca, la anterior se bloquea al llenar la
+# cola (backpressure) en vez de acumular trabajo en memoria.
+
+_DONE = object()  # Centinela de fin de entrada
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[Any]]]  # None = descartar el item
+    concurrency: int = 1
+    queue_size: int = 10
+
+
+@dataclass
+class StageStats:
+    processed: int = 0     # Items que pasaron a la siguiente etapa
+    dropped: int = 0       # El handler devolvió None (sin subs, fallo IA...)
+    errors: int = 0        # Excepción no controlada en el handler
+    busy_seconds: float = 0.0
+    active: int = 0
+    queue: Optional[asyncio.Queue] = field(default=None, repr=False)
+
+    def snapshot(self, elapsed: float) -> dict:
+        done = self.processed + self.dropped + self.errors
+        return {
+            "queue": self.queue.qsize() if self.queue else 0,
+            "active": self.active,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "per_min": round(done / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "avg_s": round(self.busy_seconds / done, 2) if done else 0.0,
+        }
+
+
+class StagedPipeline:
+    def __init__(self, stages: list[Stage], report_interval: float = 60.0):
+        self.stages = stages
+        self.report_interval = report_interval
+        self.stats = {stage.name: StageStats() for stage in stages}
+        self._started = 0.0
+
+    def report(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        return {name: s.snapshot(elapsed) for name, s in self.stats.items()}
+
+    def _print_report(self, prefix: str = "📊"):
+        parts = []
+        for name, snap in self.report().items():
+            parts.append(f"{name}: cola={snap['queue']} activos={snap['active']} "
+                         f"ok={snap['processed']} desc={snap['dropped']} err={snap['errors']} "
+                         f"{snap['per_min']}/min")
+        print(f"{prefix} " + " | ".join(parts))
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+        stats = self.stats[stage.name]
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            stats.active += 1
+            start = time.monotonic()
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                print(f"❌ Etapa {stage.name}: {e}")
+                stats.errors += 1
+                continue
+            finally:
+                stats.active -= 1
+                stats.busy_seconds += time.monotonic() - start
+            if result is None:
+                stats.dropped += 1
+                continue
+            stats.processed += 1
+            if outbox is not None:
+                await outbox.put(result)  # Bloquea si la siguiente etapa va atrasada
+
+    async def _reporter(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self._print_report()
+
+    async def run(self, items, stop_event: Optional[asyncio.Event] = None) -> dict:
+        """
+        Procesa `items` por todas las etapas y devuelve las métricas finales.
+        Si `stop_event` se activa deja de meter items nuevos, pero los que ya
+        están dentro terminan todas las etapas.
+        """
+        self._started = time.monotonic()
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        for stage, q in zip(self.stages, queues):
+            self.stats[stage.name].queue = q
+
+        workers = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            workers.append([
+                asyncio.create_task(self._worker(stage, queues[i], outbox))
+                for _ in range(max(1, stage.concurrency))
+            ])
+
+        reporter = asyncio.create_task(self._reporter())
+        try:
+            for item in items:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                await queues[0].put(item)
+            # Cierre en cascada: cuando una etapa termina, avisamos a la siguiente
+            for i, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    await queues[i].put(_DONE)
+                await asyncio.gather(*stage_workers)
+        finally:
+            reporter.cancel()
+            for stage_workers in workers:
+                for task in stage_workers:
+                    task.cancel()
+
+        self._print_report("🏁")
+        return self.report()
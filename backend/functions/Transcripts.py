@@ -0,0 +1,75 @@
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# ==========================================
+# 📜 TRANSCRIPCIÓN COMPACTA
+# ==========================================
+# Copia del array JSON de {"start", "text"} en dos blobs comprimidos, para
+# servir ventanas al reproductor sin leer ni parsear el JSON entero. No lo
+# sustituye: búsqueda, export y recompute_rates siguen usando transcript_json,
+# así que el almacenamiento total por video crece (bench_transcripts.py).
+#   starts: inicios en milisegundos como deltas int32 (little-endian) + zlib
+#   texts:  textos unidos con \x1f (separador de unidad) + zlib
+# Para servir una ventana [from, to) se descomprimen los inicios, se busca
+# el rango con bisect y solo se devuelven esos segmentos.
+TRANSCRIPT_ENCODING = 1
+TEXT_SEPARATOR = "\x1f"
+ZLIB_LEVEL = 6
+
+
+def _to_ms(start) -> int:
+    return int(round(float(start or 0) * 1000))
+
+
+def _from_ms(ms: int):
+    # Los inicios originales son segundos enteros: se devuelven igual
+    return ms // 1000 if ms % 1000 == 0 else ms / 1000
+
+
+def encode_segments(segments: list[dict]) -> dict:
+    """transcript_json -> columnas de video_transcripts."""
+    starts = [_to_ms(seg.get("start")) for seg in segments]
+    deltas = array("i", (b - a for a, b in zip([0] + starts[:-1], starts)))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    texts = TEXT_SEPARATOR.join((seg.get("text") or "").replace(TEXT_SEPARATOR, " ") for seg in segments)
+    return {
+        "encoding": TRANSCRIPT_ENCODING,
+        "segment_count": len(segments),
+        "end_ms": starts[-1] if starts else 0,
+        "starts": zlib.compress(deltas.tobytes(), ZLIB_LEVEL),
+        "texts": zlib.compress(texts.encode("utf-8"), ZLIB_LEVEL),
+    }
+
+
+def decode_starts(blob: bytes) -> list[int]:
+    deltas = array("i")
+    deltas.frombytes(zlib.decompress(blob))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return list(accumulate(deltas))
+
+
+def window_bounds(starts_ms: list[int], start_s: float | None, end_s: float | None) -> tuple[int, int]:
+    """Índices [i, j) de los segmentos visibles entre start_s y end_s (incluye el que ya sonaba en start_s)."""
+    i = 0 if start_s is None else max(bisect_right(starts_ms, _to_ms(start_s)) - 1, 0)
+    j = len(starts_ms) if end_s is None else bisect_left(starts_ms, _to_ms(end_s))
+    return i, max(i, j)
+
+
+def decode_segments(starts_blob: bytes, texts_blob: bytes, start_s: float | None = None,
+                    end_s: float | None = None) -> list[dict]:
+    starts = decode_starts(starts_blob)
+    i, j = window_bounds(starts, start_s, end_s)
+    texts = zlib.decompress(texts_blob).decode("utf-8").split(TEXT_SEPARATOR)
+    return [{"start": _from_ms(starts[k]), "text": texts[k]} for k in range(i, j)]
+
+
+def slice_segments(segments: list[dict], start_s: float | None = None, end_s: float | None = None) -> list[dict]:
+    """Misma ventana sobre un transcript_json sin codificar (videos aún sin backfill)."""
+    starts = [_to_ms(seg.get("start")) for seg in segments]
+    i, j = window_bounds(starts, start_s, end_s)
+    return segments[i:j]
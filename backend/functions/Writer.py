@@ -0,0 +1,195 @@
+import asyncio
+import os
+import time
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from database import AsyncSessionLocal
+from models.video import Video, VideoTranscript, CefrEnum, SubSourceEnum
+from functions.Search import refresh_search_vectors
+from functions.Transcripts import encode_segments
+import cache
+
+# ==========================================
+# 💾 ESCRITOR EN LOTE DEL PIPELINE
+# ==========================================
+# Acumula videos terminados y los escribe con un único
+# INSERT ... ON CONFLICT (video_id) DO UPDATE multi-fila cuando llega a
+# WRITER_MAX_ROWS o pasan WRITER_MAX_DELAY segundos desde el primero.
+WRITER_MAX_ROWS = int(os.getenv("WRITER_MAX_ROWS", "25"))
+WRITER_MAX_DELAY = float(os.getenv("WRITER_MAX_DELAY", "10"))
+
+# Calculados una sola vez (antes se reconstruían en cada guardado)
+LEVEL_VALUES = frozenset(e.value for e in CefrEnum)
+SUB_SOURCE_VALUES = frozenset(e.value for e in SubSourceEnum)
+
+# Columnas que se sobrescriben si el video ya existía (created_at se conserva)
+UPSERT_COLUMNS = [
+    "title", "url", "channel_name", "topics", "accents", "content_types", "level",
+    "wpm", "rate_profile", "subtitle_source", "language", "transcript", "transcript_json", "ai_analysis",
+]
+
+
+def build_video_row(final_data: dict) -> dict:
+    """Paquete del pipeline -> fila de la tabla videos (filtrado y normalizado)."""
+    # 1. Extracción de datos para COLUMNAS SQL (Filtrado)
+    level_val = final_data.get("level")
+    if level_val not in LEVEL_VALUES:
+        level_val = None 
+    
+    sub_source_val = final_data.get("subtitle_source", "none")
+    if sub_source_val not in SUB_SOURCE_VALUES:
+        sub_source_val = "none"
+
+    # Arrays
+    accents_list = final_data.get("accents", [])
+    if isinstance(accents_list, str): accents_list = [accents_list]
+    
+    types_list = final_data.get("content_types", [])
+    if isinstance(types_list, str): types_list = [types_list]
+
+    topics_list = final_data.get("topics", [])
+
+    # 2. Construcción del JSON LIMPIO (ai_analysis)
+    ai_clean_json = {
+        "transcript_summary": final_data.get("transcript_summary"),
+        "vocabulary": final_data.get("vocabulary", []),
+        "grammar_stats": final_data.get("grammar_stats", {}),
+        "wpm_estimate": final_data.get("wpm_estimate"),
+        "transcript_path": final_data.get("transcript_path"),  # http | browser
+        "prompt_version": final_data.get("prompt_version"),    # PromptTemplate.id que lo produjo
+        "local_analysis": final_data.get("local_analysis")     # CEFR/dificultad sin LLM
+    }
+
+    return {
+        "video_id": final_data["video_id"],
+        "title": final_data["title"],
+        "url": final_data["url"],
+        "channel_name": final_data["channel"],
+        # --- COLUMNAS SQL ---
+        "topics": topics_list,
+        "accents": accents_list,
+        "content_types": types_list,
+        "level": level_val,
+        "wpm": final_data["wpm"],
+        "rate_profile": final_data.get("rate_profile"),
+        "subtitle_source": sub_source_val,
+        "language": final_data.get("language", "en"),
+        # --- DATOS DE TEXTO ---
+        "transcript": None, # No guardamos texto plano para ahorrar espacio
+        "transcript_json": final_data.get("transcript_json", []),
+        # --- COLUMNA JSON ---
+        "ai_analysis": ai_clean_json,
+    }
+
+
+def upsert_statement(rows: list[dict]):
+    stmt = pg_insert(Video).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Video.video_id],
+        set_={**{c: stmt.excluded[c] for c in UPSERT_COLUMNS}, "updated_at": func.now()},
+    )
+
+
+async def upsert_transcripts(session, items: list[tuple[str, list]]):
+    """
+    (video_id, transcript_json) -> video_transcripts (formato compacto), en la
+    transacción dada (AsyncSession o AsyncConnection).
+    """
+    rows = [{"video_id": vid, **encode_segments(segments or [])} for vid, segments in items]
+    if not rows:
+        return
+    stmt = pg_insert(VideoTranscript).values(rows)
+    await session.execute(stmt.on_conflict_do_update(
+        index_elements=[VideoTranscript.video_id],
+        set_={**{c: stmt.excluded[c] for c in ("encoding", "segment_count", "end_ms", "starts", "texts")},
+              "updated_at": func.now()},
+    ))
+
+
+class BufferedVideoWriter:
+    def __init__(self, max_rows: int = WRITER_MAX_ROWS, max_delay: float = WRITER_MAX_DELAY,
+                 on_written=None, on_failed=None):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        # Avisos opcionales tras cada flush: async (ids) / async (video_id, error)
+        self.on_written = on_written
+        self.on_failed = on_failed
+        self._buffer: dict[str, dict] = {}   # video_id -> fila (la última gana)
+        self._first_at = 0.0
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self.stats = {"written": 0, "failed": 0, "batches": 0}
+        self.errors: list[dict] = []         # Últimos errores por fila
+
+    async def add(self, final_data: dict):
+        """Encola un video terminado. Escribe en el momento si el buffer se llena."""
+        try:
+            row = build_video_row(final_data)
+        except Exception as e:
+            await self._record_error(final_data.get("video_id"), e)
+            return
+        if not self._buffer:
+            self._first_at = time.monotonic()
+        self._buffer[row["video_id"]] = row
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._timer_loop())
+        if len(self._buffer) >= self.max_rows:
+            await self.flush()
+
+    async def _timer_loop(self):
+        while True:
+            await asyncio.sleep(max(self.max_delay / 4, 0.5))
+            if self._buffer and time.monotonic() - self._first_at >= self.max_delay:
+                await self.flush()
+
+    async def _record_error(self, video_id, error):
+        print(f"❌ Error guardando SQL {video_id}: {error}")
+        self.stats["failed"] += 1
+        self.errors = (self.errors + [{"video_id": video_id, "error": str(error)[:300]}])[-100:]
+        if self.on_failed and video_id:
+            await self.on_failed(video_id, f"db_write: {error}")
+
+    async def _write(self, rows: list[dict]):
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                await session.execute(upsert_statement(rows))
+                await upsert_transcripts(session, [(r["video_id"], r["transcript_json"]) for r in rows])
+                await refresh_search_vectors(session, [r["video_id"] for r in rows])
+
+    async def flush(self):
+        async with self._lock:
+            if not self._buffer:
+                return
+            rows = list(self._buffer.values())
+            self._buffer = {}
+
+            try:
+                await self._write(rows)
+                written = [r["video_id"] for r in rows]
+            except Exception as e:
+                # Un lote fallido no debe tumbar a los demás: reintento fila a fila
+                print(f"⚠️ Lote de {len(rows)} falló ({str(e)[:80]}). Reintentando fila a fila...")
+                written = []
+                for row in rows:
+                    try:
+                        await self._write([row])
+                        written.append(row["video_id"])
+                    except Exception as row_error:
+                        await self._record_error(row["video_id"], row_error)
+
+            self.stats["batches"] += 1
+            self.stats["written"] += len(written)
+            if written:
+                print(f"💾 Guardados {len(written)} videos en DB (lote #{self.stats['batches']}).")
+                await cache.invalidate_videos(written)
+                if self.on_written:
+                    await self.on_written(written)
+
+    async def close(self):
+        """Vacía lo pendiente y para el temporizador (llamar al apagar)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
@@ -0,0 +1,185 @@
+"""
+Restaura o siembra la tabla videos desde un volcado (db/data-*.csv o el
+NDJSON/CSV de export_catalog.py) usando COPY y upsert por video_id.
+
+Uso:
+    python import_catalog.py ../db/data-1768317017541.csv
+    python import_catalog.py delta.ndjson --chunk-rows 5000
+
+El archivo se lee en streaming y se carga por trozos: cada trozo va por COPY
+binario a una tabla temporal y de ahí a videos con
+INSERT ... ON CONFLICT (video_id) DO UPDATE, en su propia transacción.
+La memoria depende de --chunk-rows, no del tamaño del archivo. Solo se
+cargan las columnas que trae el archivo; el resto conserva su valor.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+
+from sqlalchemy import text
+
+from database import engine
+from functions.Dump import DUMP_COLUMNS, parse_dump_row, parse_ndjson_row
+from functions.Search import refresh_search_vectors
+from functions.Writer import upsert_transcripts
+import cache
+
+STAGING_TABLE = "videos_import"
+DEFAULT_CHUNK_ROWS = 2000
+
+
+def iter_dump_rows(path: str, fmt: str):
+    """Genera filas normalizadas (JSON como texto, arrays como listas)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for raw in csv.DictReader(f):
+                yield parse_dump_row(raw, parse_json=False)
+        else:
+            for line in f:
+                if line.strip():
+                    yield parse_ndjson_row(json.loads(line))
+
+
+def file_columns(path: str, fmt: str) -> set[str]:
+    """Columnas que trae el archivo: cabecera del CSV o claves de la primera línea NDJSON."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            return set(csv.DictReader(f).fieldnames or [])
+        for line in f:
+            if line.strip():
+                return set(json.loads(line))
+    return set()
+
+
+async def target_columns(conn, present: set[str]) -> list[str]:
+    """
+    Columnas a cargar: las del volcado que vienen en el archivo y existen en
+    la tabla destino (tolera esquemas antiguos). Las que faltan en el archivo
+    no se tocan: ni se insertan como NULL ni se sobrescriben en el upsert.
+    """
+    result = await conn.execute(text(
+        "SELECT attname FROM pg_attribute "
+        "WHERE attrelid = 'videos'::regclass AND attnum > 0 AND NOT attisdropped"
+    ))
+    existing = {r[0] for r in result}
+    return [c for c in DUMP_COLUMNS if c in existing and c in present]
+
+
+async def has_compact_transcripts(conn) -> bool:
+    """video_transcripts existe (esquemas anteriores no la tienen)."""
+    result = await conn.execute(text("SELECT to_regclass('video_transcripts') IS NOT NULL"))
+    return bool(result.scalar())
+
+
+async def load_chunk(conn, columns: list[str], rows: list[dict], compact: bool = True) -> list[str]:
+    """
+    COPY del trozo a la tabla temporal y upsert a videos. Devuelve los IDs
+    escritos. Si el volcado trae transcript_json, la versión compacta
+    (video_transcripts) se reescribe en la misma transacción.
+    """
+    col_list = ", ".join(columns)
+    # created_at nunca queda NULL (la API lo exige para el cursor y los
+    # esquemas): si falta en la fila se usa now() y un video existente
+    # conserva su fecha de alta
+    select_list = ", ".join("COALESCE(created_at, now())" if c == "created_at" else c for c in columns)
+    updates = ", ".join(
+        "created_at = COALESCE(videos.created_at, EXCLUDED.created_at)" if c == "created_at"
+        else f"{c} = EXCLUDED.{c}"
+        for c in columns if c != "video_id"
+    )
+    with_transcript = compact and "transcript_json" in columns
+    returning = "video_id, transcript_json" if with_transcript else "video_id"
+
+    async with conn.begin():
+        # El TRUNCATE abre la transacción antes de usar la conexión asyncpg directa
+        await conn.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=[tuple(row.get(c) for c in columns) for row in rows],
+            columns=columns,
+        )
+        result = await conn.execute(text(
+            f"INSERT INTO videos ({col_list}) "
+            f"SELECT DISTINCT ON (video_id) {select_list} FROM {STAGING_TABLE} ORDER BY video_id "
+            f"ON CONFLICT (video_id) DO UPDATE SET {updates} "
+            f"RETURNING {returning}"
+        ))
+        written = result.all()
+        video_ids = [row.video_id for row in written]
+        if with_transcript:
+            # Lo que quedó en la tabla (DISTINCT ON elige una fila si el ID se repite)
+            await upsert_transcripts(conn, [
+                (row.video_id, json.loads(row.transcript_json) if isinstance(row.transcript_json, str)
+                 else row.transcript_json)
+                for row in written
+            ])
+        await refresh_search_vectors(conn, video_ids)
+    return video_ids
+
+
+async def run_import(args):
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    total, start = 0, time.time()
+
+    async with engine.connect() as conn:
+        async with conn.begin():
+            # Dentro de la transacción explícita (un execute suelto la abriría solo)
+            columns = await target_columns(conn, file_columns(args.path, fmt))
+            if "video_id" not in columns:
+                raise SystemExit(f"❌ {args.path} no tiene la columna video_id.")
+            compact = await has_compact_transcripts(conn)
+            # Mismos tipos que la tabla real (enums, arrays, json) para que COPY no tenga que castear
+            await conn.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} AS "
+                f"SELECT {', '.join(columns)} FROM videos WITH NO DATA"
+            ))
+
+        chunk = []
+
+        async def flush():
+            nonlocal total
+            video_ids = await load_chunk(conn, columns, chunk, compact)
+            await cache.invalidate_videos(video_ids)
+            total += len(chunk)
+            elapsed = time.time() - start
+            print(f"📥 {total} filas | {total / elapsed:,.0f} filas/s")
+            chunk.clear()
+
+        for row in iter_dump_rows(args.path, fmt):
+            if not row.get("video_id"):
+                continue
+            chunk.append(row)
+            if len(chunk) >= args.chunk_rows:
+                await flush()
+        if chunk:
+            await flush()
+
+    elapsed = time.time() - start
+    rate = total / elapsed if elapsed else 0
+    print(f"✅ Importación terminada: {total} filas en {elapsed:.1f}s ({rate:,.0f} filas/s).")
+
+
+async def main_async(args):
+    try:
+        connection = cache.connect()
+        await connection.ping()
+        await cache.init_cache(connection)
+    except Exception as e:
+        print(f"⚠️ Redis no disponible, la API servirá caché hasta su TTL: {e}")
+    await run_import(args)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Volcado CSV o NDJSON")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Por defecto según la extensión")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,37 @@
 import uvicorn
-import redis.asyncio as redis
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_limiter import FastAPILimiter
 
 # Importamos el router
 from routers import videos
+import cache
+from functions.Filters import filter_catalog
+from database import pool_metrics
+from compression import CompressionMiddleware
 
 # --- CONFIGURACIÓN DE REDIS ---
-# Asegúrate de que Redis esté corriendo (Docker o local)
-REDIS_URL = "redis://localhost:6379"
+# Asegúrate de que Redis esté corriendo (Docker o local). URL en cache.REDIS_URL
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # 0. Precargar filtros (Data/*.json) en memoria
+    filter_catalog.get()
+
     # 1. AL INICIAR: Conectar a Redis
     try:
-        redis_connection = redis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+        redis_connection = cache.connect()
         await FastAPILimiter.init(redis_connection)
-        print("✅ Redis conectado y Rate Limiter activado.")
+        await cache.init_cache(redis_connection)
+        print("✅ Redis conectado: Rate Limiter y caché de lecturas activados.")
     except Exception as e:
         print(f"❌ Error conectando a Redis: {e}")
     
     yield # Aquí corre la aplicación
     
-    # 2. AL APAGAR: Cerrar conexión
+    # 2. AL APAGAR: Cerrar conexiones
+    await cache.close_cache()
     await redis_connection.close()
 
 # Inyectamos el lifespan en la app
@@ -42,9 +49,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[videos.NEXT_CURSOR_HEADER, "ETag"],
 )
+# Compresión gzip/br/zstd negociada por Accept-Encoding (umbral COMPRESSION_MIN_SIZE)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(videos.router)
 
+# --- MÉTRICAS ---
+@app.get("/metrics/cache", dependencies=[Depends(videos.verify_admin_key)])
+async def read_cache_metrics():
+    """🔒 Aciertos/fallos de la caché de lecturas (para dimensionar Redis)."""
+    return await cache.cache_stats()
+
+@app.get("/metrics/db-pool", dependencies=[Depends(videos.verify_admin_key)])
+async def read_pool_metrics():
+    """🔒 Conexiones en uso, overflow y tiempo de espera del pool de Postgres."""
+    return pool_metrics()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy.sql import func
+from database import Base
+import enum
+from sqlalchemy.dialects.postgresql import ARRAY
+
+# --- ESTADO DE RASTREO POR PLAYLIST ---
+class PlaylistState(Base):
+    __tablename__ = "playlist_state"
+
+    playlist_url = Column(String, primary_key=True)
+    known_ids = Column(ARRAY(Text), default=[])      # IDs ya enumerados (los nuevos van a crawl_jobs)
+    head_ids = Column(ARRAY(Text), default=[])       # Primeras posiciones en la última sonda
+    last_position = Column(Integer, default=0)       # Hasta dónde se ha recorrido (1-indexado)
+    total_count = Column(Integer, nullable=True)     # Tamaño según yt-dlp en la última visita
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+    last_changed_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# --- COLA DURADERA DE TRABAJOS (un registro por video) ---
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    claimed = "claimed"        # Reservado por un proceso, aún sin empezar
+    scraping = "scraping"
+    analyzing = "analyzing"
+    done = "done"
+    failed = "failed"
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+
+    video_id = Column(String, primary_key=True)
+    url = Column(String, nullable=False)
+    playlist_url = Column(String, nullable=True)
+    status = Column(String(16), nullable=False, default=JobStatus.queued.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())  # NULL = no se reintenta
+    lease_owner = Column(String, nullable=True)       # Proceso que lo tiene reservado
+    lease_expires = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)          # ej: 'transcript_too_short'
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Reclamo de trabajo: WHERE status ... AND next_attempt_at <= now()
+        Index("idx_jobs_claim", "status", "next_attempt_at"),
+        Index("idx_jobs_playlist", "playlist_url", "status"),
+    )
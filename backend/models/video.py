@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Integer, Enum as PgEnum, JSON, DateTime, Text
+from sqlalchemy import Column, String, Integer, SmallInteger, Enum as PgEnum, JSON, DateTime, Text, Index, LargeBinary, ForeignKey
 from sqlalchemy.sql import func
 from database import Base
 import enum
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 
 # --- ENUMS ---
 class CefrEnum(str, enum.Enum):
@@ -41,7 +42,33 @@ class Video(Base):
     language = Column(String, default="en") # ej: 'en', 'es'
     transcript = Column(Text, nullable=True) # Texto completo del video
     transcript_json = Column(JSON, default=[])
+    # Velocidad por tramos (functions/Rates.py): {"wpm", "bins", "p10", "p50", "p90", "speech_seconds"}
+    rate_profile = Column(JSON, nullable=True)
     # Datos extra y Fechas
     ai_analysis = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Índice de búsqueda (título + transcripción + vocabulario). Lo rellenan las
+    # escrituras con functions.Search.refresh_search_vectors; nunca se selecciona.
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+
+    __table_args__ = (
+        # Paginación keyset de GET /videos/ (ORDER BY created_at DESC, video_id DESC)
+        Index("idx_created_video", "created_at", "video_id"),
+        Index("idx_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+# --- TRANSCRIPCIÓN COMPACTA (functions/Transcripts.py) ---
+# Copia de transcript_json para leer ventanas; se suma a su tamaño, no lo reemplaza.
+class VideoTranscript(Base):
+    __tablename__ = "video_transcripts"
+
+    video_id = Column(String, ForeignKey("videos.video_id", ondelete="CASCADE"), primary_key=True)
+    encoding = Column(SmallInteger, nullable=False, default=1)
+    segment_count = Column(Integer, nullable=False, default=0)
+    end_ms = Column(Integer, nullable=False, default=0)    # Inicio del último segmento
+    starts = Column(LargeBinary, nullable=False)           # Deltas int32 en ms, zlib
+    texts = Column(LargeBinary, nullable=False)            # Textos unidos por \x1f, zlib
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
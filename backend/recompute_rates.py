@@ -0,0 +1,109 @@
+"""
+Recalcula wpm y rate_profile de todo el catálogo a partir de transcript_json
+(functions/Rates.py). Corrige valores imposibles como los 8343 wpm que dejó
+la duración de respaldo de 600 s.
+
+Uso:
+    python recompute_rates.py                 # todo el catálogo
+    python recompute_rates.py --dry-run       # solo informa de los cambios
+    python recompute_rates.py --chunk-rows 5000
+
+Postgres extrae los inicios y cuenta palabras por segmento (arrays float8[]
+e int[]); cada trozo se calcula de una vez con NumPy y se escribe con un
+UPDATE masivo por clave primaria del ORM.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import text, update
+
+from database import AsyncSessionLocal, engine
+from models.video import Video
+from functions.Rates import compute_rates, flatten, rate_profile
+import cache
+
+DEFAULT_CHUNK_ROWS = 2000
+
+# Inicio y número de palabras de cada segmento, en el orden de transcript_json
+SEGMENTS_QUERY = text("""
+    SELECT v.video_id, v.wpm,
+        ARRAY(SELECT coalesce((e->>'start')::float8, 0)
+              FROM jsonb_array_elements(v.transcript_json::jsonb) WITH ORDINALITY AS t(e, i)
+              ORDER BY i) AS starts,
+        ARRAY(SELECT CASE WHEN btrim(coalesce(e->>'text', '')) = '' THEN 0
+                          ELSE array_length(regexp_split_to_array(btrim(e->>'text'), '\\s+'), 1) END
+              FROM jsonb_array_elements(v.transcript_json::jsonb) WITH ORDINALITY AS t(e, i)
+              ORDER BY i) AS words
+    FROM videos v
+    WHERE jsonb_typeof(v.transcript_json::jsonb) = 'array'
+    ORDER BY v.video_id
+""")
+
+
+def compute_updates(rows) -> tuple[list[dict], int]:
+    """Filas (video_id, wpm, starts, words) -> parámetros del UPDATE y nº de wpm corregidos."""
+    starts, words, lengths = flatten([r.starts for r in rows], [r.words for r in rows])
+    wpm, profiles, speech = compute_rates(starts, words, lengths)
+    reliable = np.flatnonzero(~np.isnan(wpm))
+    new_wpm = np.rint(wpm[reliable]).astype(np.int64)
+    old_wpm = np.array([rows[i].wpm or 0 for i in reliable], dtype=np.int64)
+    params = [
+        {"video_id": rows[i].video_id, "wpm": int(value), "rate_profile": rate_profile(wpm[i], profiles[i], speech[i])}
+        for i, value in zip(reliable.tolist(), new_wpm.tolist())
+    ]
+    return params, int(np.count_nonzero(new_wpm != old_wpm))
+
+
+async def write_chunk(params: list[dict]):
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            # ORM bulk UPDATE by primary key (executemany)
+            await session.execute(update(Video), params)
+    await cache.invalidate_videos([p["video_id"] for p in params])
+
+
+async def run(args):
+    start = time.time()
+    seen = updated = changed = 0
+    compute_s = 0.0
+
+    async with AsyncSessionLocal() as reader:
+        result = await reader.stream(SEGMENTS_QUERY.execution_options(yield_per=args.chunk_rows))
+        async for rows in result.partitions():
+            t0 = time.perf_counter()
+            params, corrected = compute_updates(rows)
+            compute_s += time.perf_counter() - t0
+            seen += len(rows)
+            changed += corrected
+            if params and not args.dry_run:
+                await write_chunk(params)
+            updated += len(params)
+            print(f"🗣️ {seen} videos | {updated} con wpm fiable | {changed} corregidos | {seen / (time.time() - start):,.0f} videos/s")
+
+    elapsed = time.time() - start
+    verb = "se corregirían" if args.dry_run else "corregidos"
+    print(f"✅ {seen} videos en {elapsed:.1f}s (NumPy {compute_s:.2f}s). wpm {verb}: {changed}.")
+
+
+async def main_async(args):
+    try:
+        connection = cache.connect()
+        await connection.ping()
+        await cache.init_cache(connection)
+    except Exception as e:
+        print(f"⚠️ Redis no disponible, la API servirá caché hasta su TTL: {e}")
+    await run(args)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="No escribe; solo cuenta")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
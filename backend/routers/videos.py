@@ -1,18 +1,31 @@
+import base64
+import hashlib
 import json
 import os
-from fastapi import APIRouter, Depends, HTTPException, Query, Security, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, Security, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, select
-from typing import List, Optional
+from sqlalchemy import and_, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import load_only
+from typing import Any, Dict, List, Literal, Optional, Union
 
 # --- RATE LIMITING (Redis) ---
 from fastapi_limiter.depends import RateLimiter
 
 # --- IMPORTACIONES DEL PROYECTO ---
-from database import AsyncSessionLocal
-from models.video import Video, CefrEnum, SubSourceEnum
-from schemas.video import VideoResponse, VideoUpdate, VideoCreate
+from database import AsyncSessionLocal, get_db
+from models.video import Video, VideoTranscript, CefrEnum, SubSourceEnum
+from schemas.video import VideoResponse, VideoSearchResult, VideoSummary, VideoUpdate, VideoCreate
+from functions.Search import apply_filters, refresh_search_vectors, search_query
+from functions.Filters import filter_catalog
+from functions.Export import EXPORT_FORMATS, iter_export
+from functions.Transcripts import decode_segments, slice_segments
+from functions.Writer import upsert_transcripts
+import cache
 
 # ==========================================
 # 🔐 CONFIGURACIÓN DE SEGURIDAD
@@ -51,95 +64,327 @@ router = APIRouter(
     tags=["Videos"]
 )
 
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
+# Los filtros cambian muy poco: el navegador revalida con ETag tras 5 min
+FILTERS_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+# Catálogo: el navegador guarda la respuesta pero revalida siempre (304 barato)
+CATALOG_CACHE_CONTROL = "no-cache"
+
+# ==========================================
+# 📑 PAGINACIÓN POR CURSOR (KEYSET)
+# ==========================================
+# El cursor es opaco para el cliente: base64 de [created_at, video_id] del
+# último elemento de la página. Se devuelve en la cabecera X-Next-Cursor.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, video_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), video_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, video_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(video_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+# ==========================================
+# 🪶 PROYECCIONES DEL LISTADO
+# ==========================================
+# Columnas pesadas (transcripción y análisis IA) que el listado no carga
+# salvo que se pidan explícitamente con ?view=full o ?fields=.
+SUMMARY_FIELDS = list(VideoSummary.model_fields)
+ALLOWED_FIELDS = set(VideoResponse.model_fields)
+
+def resolve_fields(view: str, fields: Optional[str]) -> Optional[List[str]]:
+    """Devuelve las columnas a cargar, o None si se pide el registro completo."""
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in ALLOWED_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(unknown)}")
+        return requested
+    if view == "full":
+        return None
+    return SUMMARY_FIELDS
+
+def serialize_videos(videos, selected: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if selected is None:
+        return [VideoResponse.model_validate(v).model_dump(mode="json") for v in videos]
+    if selected is SUMMARY_FIELDS:
+        return [VideoSummary.model_validate(v).model_dump(mode="json") for v in videos]
+    return [jsonable_encoder({f: getattr(v, f) for f in selected}) for v in videos]
+
+def make_etag(*parts: str) -> str:
+    return '"' + hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+def video_etag(video_id: str, created_at: datetime, updated_at: Optional[datetime], variant: str = "") -> str:
+    """ETag fuerte del detalle: cambia solo cuando el video se reescribe (created_at es NOT NULL)."""
+    return make_etag(*([variant] if variant else []), video_id, (updated_at or created_at).isoformat())
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in candidates
+
+def json_page(request: Request, body: str, etag: str, next_cursor: Optional[str] = None,
+              cache_control: str = CATALOG_CACHE_CONTROL) -> Response:
+    """
+    Respuesta JSON ya serializada (misma forma venga de caché o de la DB).
+    Si el cliente ya tiene esta versión (If-None-Match) devuelve 304 sin cuerpo.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ==========================================
 # 1. ZONA PÚBLICA (SOLO LECTURA)
 #    No pide clave, pero tiene Rate Limit.
 # ==========================================
-@router.get("/", response_model=List[VideoResponse])
+# La respuesta ya va serializada (json_page): el modelo solo documenta las
+# dos formas en OpenAPI. Con ?fields= llega un subconjunto de VideoResponse.
+@router.get("/", response_model=Union[List[VideoSummary], List[VideoResponse]])
 async def read_videos(
+    request: Request,
     title: Optional[str] = None,
     level: Optional[str] = None,
     language: Optional[str] = None,
     accent: Optional[str] = None,
     topic: Optional[str] = None,
     content_types: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    view: Literal["summary", "full"] = "summary",
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    Lista paginada por cursor: pasa el valor de la cabecera X-Next-Cursor
+    como `?cursor=` para pedir la siguiente página. `skip` se mantiene solo
+    por compatibilidad y se ignora cuando llega un cursor.
+
+    Por defecto devuelve la vista resumida (VideoSummary) sin transcript_json
+    ni ai_analysis. `?view=full` devuelve el registro completo y
+    `?fields=title,level,...` solo las columnas indicadas.
+    """
+    selected = resolve_fields(view, fields)
+
+    cache_key = await cache.list_key({
+        "title": title, "level": level, "language": language, "accent": accent,
+        "topic": topic, "content_types": content_types, "cursor": cursor,
+        "skip": None if cursor else skip, "limit": limit,
+        "fields": ",".join(selected) if selected is not None else None,
+    })
+    cached = await cache.get_cached(cache_key, "list")
+    if cached:
+        return json_page(request, cached["body"], cached.get("etag") or make_etag(cached["body"]), cached.get("cursor"))
+
     query = select(Video)
+    if selected is not None:
+        # created_at y video_id siempre hacen falta para el cursor
+        columns = set(selected) | {"created_at", "video_id"}
+        query = query.options(load_only(*[getattr(Video, c) for c in columns]))
 
     if title:
         query = query.where(Video.title.ilike(f"%{title}%"))
-    if level:
-        query = query.where(Video.level == level)
-    if language:
-        query = query.where(Video.language == language)
-    
-    # Filtros para Arrays (Postgres)
-    if accent:
-        # Busca si el acento está contenido en el array accents
-        query = query.where(Video.accents.any(accent))
-    if topic:
-        query = query.where(Video.topics.any(topic))
-    if content_types:
-        query = query.where(Video.content_types.any(content_types))
-
-    # Ordenar por fecha de creación descendente
-    query = query.order_by(Video.created_at.desc()).offset(skip).limit(limit)
+    query = apply_filters(query, level, language, accent, topic, content_types)
+
+    # Keyset: (created_at, video_id) < cursor usa el índice idx_created_video
+    if cursor:
+        cursor_created_at, cursor_video_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Video.created_at, Video.video_id) < (cursor_created_at, cursor_video_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    # Ordenar por fecha de creación descendente (video_id desempata)
+    query = query.order_by(Video.created_at.desc(), Video.video_id.desc()).limit(limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    videos = result.scalars().all()
+
+    # Solo hay siguiente página si la actual vino llena
+    next_cursor = ""
+    if len(videos) == limit:
+        last = videos[-1]
+        next_cursor = encode_cursor(last.created_at, last.video_id)
+
+    body = json.dumps(serialize_videos(videos, selected))
+    etag = make_etag(body)
+    await cache.set_cached(cache_key, {"body": body, "etag": etag, "cursor": next_cursor}, cache.LIST_TTL)
+    return json_page(request, body, etag, next_cursor)
 
 
 @router.get("/filters")
-def get_filters():
+async def get_filters(request: Request):
     """
     Carga: Niveles.json, Etiquetas.json, Tipos.json y accents.json
     Devuelve la estructura exacta para que el Frontend monte los selectores.
+    Sale de la caché en memoria (functions.Filters) con ETag: si el navegador
+    manda If-None-Match con la versión actual respondemos 304 sin cuerpo.
     """
-    try:
-        base_path = "Data" # Asegúrate de que la carpeta se llame así
-        
-        def load_json(filename):
-            path = os.path.join(base_path, filename)
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return []
-
-        levels = load_json("Niveles.json")
-        topics = load_json("Etiquetas.json")
-        content_types = load_json("Tipos.json")
-        
-        # Cargar el archivo de acentos complejo que me mostraste
-        accents_data = load_json("accents.json") 
-        if not accents_data:
-            accents_data = {} # Fallback vacío si falla
-
-        return {
-            "levels": levels,
-            "topics": topics,
-            "content_types": content_types,
-            "accents_data": accents_data # Enviamos el objeto completo (en, es, fr...)
-        }
-    except Exception as e:
-        print(f"❌ Error cargando filtros: {e}")
-        return {"levels": [], "topics": [], "content_types": [], "accents_data": {}}
+    snapshot = filter_catalog.get()
+    return json_page(request, snapshot.body, snapshot.etag, cache_control=FILTERS_CACHE_CONTROL)
+    
+
+@router.get("/search", response_model=List[VideoSearchResult])
+async def search_videos(
+    q: str = Query(..., min_length=2),
+    level: Optional[str] = None,
+    language: Optional[str] = None,
+    accent: Optional[str] = None,
+    topic: Optional[str] = None,
+    content_types: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Búsqueda por relevancia sobre título, transcripción y vocabulario.
+    Admite sintaxis tipo web ("frase exacta", -excluir, OR) y los mismos
+    filtros que el listado.
+    """
+    tsquery = search_query(q)
+    rank = func.ts_rank_cd(Video.search_vector, tsquery).label("rank")
+    query = (
+        select(Video, rank)
+        .options(load_only(*[getattr(Video, c) for c in SUMMARY_FIELDS]))
+        .where(Video.search_vector.op("@@")(tsquery))
+    )
+    query = apply_filters(query, level, language, accent, topic, content_types)
+    query = query.order_by(rank.desc(), Video.video_id).offset(skip).limit(limit)
+
+    result = await db.execute(query)
+    return [
+        VideoSearchResult(**VideoSummary.model_validate(video).model_dump(), rank=score)
+        for video, score in result.all()
+    ]
     
     
+@router.get("/export", dependencies=[Depends(verify_admin_key)]) # <--- CANDADO 🔒
+async def export_videos(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: Optional[datetime] = None,
+    level: Optional[str] = None,
+    language: Optional[str] = None,
+    accent: Optional[str] = None,
+    topic: Optional[str] = None,
+    content_types: Optional[str] = None,
+):
+    """
+    🔒 PRIVADO: Volcado del catálogo en streaming (NDJSON o CSV con el mismo
+    formato que db/data-*.csv). Con `?since=` solo exporta lo creado o
+    modificado después de esa fecha (sincronización incremental).
+    """
+    async def stream():
+        # Sesión propia: debe seguir abierta mientras se envía la respuesta
+        async with AsyncSessionLocal() as session:
+            async for chunk in iter_export(
+                session, format, since, level=level, language=language,
+                accent=accent, topic=topic, content_types=content_types,
+            ):
+                yield chunk
+
+    filename = f"videos-{datetime.now().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{video_id}", response_model=VideoResponse)
-async def read_video(video_id: str, db: AsyncSession = Depends(get_db)):
+async def read_video(
+    video_id: str,
+    request: Request,
+    transcript: bool = Query(True, description="false: sin transcript_json (usar /{video_id}/transcript por ventanas)"),
+    db: AsyncSession = Depends(get_db),
+):
+    cache_key = cache.detail_key(video_id, lite=not transcript)
+    cached = await cache.get_cached(cache_key, "detail")
+    if cached:
+        return json_page(request, cached["body"], cached.get("etag") or make_etag(cached["body"]))
+
+    # Revalidación sin caché: basta con las fechas para saber si cambió
+    if request.headers.get("if-none-match"):
+        res = await db.execute(
+            select(Video.created_at, Video.updated_at).where(Video.video_id == video_id)
+        )
+        row = res.one_or_none()
+        if row is not None:
+            etag = video_etag(video_id, row.created_at, row.updated_at, "" if transcript else "lite")
+            if etag_matches(request, etag):
+                return json_page(request, "", etag)
+
     query = select(Video).where(Video.video_id == video_id)
+    if not transcript:
+        query = query.options(load_only(*[getattr(Video, c) for c in ALLOWED_FIELDS if c != "transcript_json"]))
     result = await db.execute(query)
     video = result.scalar_one_or_none()
     if video is None:
         raise HTTPException(status_code=404, detail="Video not found")
-    return video
+
+    if transcript:
+        body = VideoResponse.model_validate(video).model_dump_json()
+    else:
+        fields = {c: getattr(video, c) for c in ALLOWED_FIELDS if c != "transcript_json"}
+        body = json.dumps(jsonable_encoder(fields), ensure_ascii=False)
+    etag = video_etag(video.video_id, video.created_at, video.updated_at, "" if transcript else "lite")
+    await cache.set_cached(cache_key, {"body": body, "etag": etag}, cache.DETAIL_TTL)
+    return json_page(request, body, etag)
+
+
+@router.get("/{video_id}/transcript")
+async def read_transcript(
+    video_id: str,
+    request: Request,
+    start: Optional[float] = Query(None, alias="from", ge=0, description="Segundo inicial (incluye el segmento en curso)"),
+    end: Optional[float] = Query(None, alias="to", ge=0, description="Segundo final (exclusivo)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ventana [from, to) de la transcripción para el reproductor, desde el formato compacto."""
+    if start is not None and end is not None and end < start:
+        raise HTTPException(status_code=400, detail="'to' debe ser mayor o igual que 'from'")
+
+    res = await db.execute(
+        select(VideoTranscript.starts, VideoTranscript.texts, VideoTranscript.segment_count, VideoTranscript.updated_at)
+        .where(VideoTranscript.video_id == video_id)
+    )
+    compact = res.one_or_none()
+    if compact is not None:
+        etag = make_etag("transcript", video_id, str(compact.updated_at), str(start), str(end))
+        if etag_matches(request, etag):
+            return json_page(request, "", etag)
+        segments = decode_segments(compact.starts, compact.texts, start, end)
+        total = compact.segment_count
+    else:
+        # Videos aún sin backfill: se recorta el JSON original
+        res = await db.execute(
+            select(Video.transcript_json, Video.created_at, Video.updated_at).where(Video.video_id == video_id)
+        )
+        row = res.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Video not found")
+        etag = make_etag("transcript", video_id, str(row.created_at), str(row.updated_at), str(start), str(end))
+        if etag_matches(request, etag):
+            return json_page(request, "", etag)
+        segments = slice_segments(row.transcript_json or [], start, end)
+        total = len(row.transcript_json or [])
+
+    body = json.dumps({
+        "video_id": video_id, "from": start, "to": end,
+        "segment_count": total, "segments": segments,
+    }, ensure_ascii=False)
+    return json_page(request, body, etag)
 
 
 # ==========================================
@@ -147,6 +392,54 @@ async def read_video(video_id: str, db: AsyncSession = Depends(get_db)):
 #    Requiere Header: 'x-admin-key'
 # ==========================================
 
+# Carga masiva: un INSERT multi-fila por trozo (asyncpg admite 32767 parámetros)
+BATCH_MAX_VIDEOS = int(os.getenv("BATCH_MAX_VIDEOS", "2000"))
+BATCH_CHUNK_ROWS = 500
+NDJSON_MAX_LINE_BYTES = 8 * 1024 * 1024   # Una transcripción larga cabe de sobra
+NDJSON_MAX_ERRORS = 100                   # Errores detallados que se devuelven
+NDJSON_MAX_IDS = 1000                     # IDs creados/ignorados que se devuelven
+
+async def insert_videos_ignoring_existing(db: AsyncSession, videos: List[VideoCreate]) -> List[str]:
+    """
+    INSERT ... ON CONFLICT (video_id) DO NOTHING RETURNING video_id.
+    Devuelve solo los IDs que se crearon realmente; no hace commit.
+    Si un ID se repite en la carga solo cuenta su primera aparición (la
+    que insertaría DO NOTHING), también para la transcripción compacta.
+    """
+    first_by_id: Dict[str, VideoCreate] = {}
+    for vid in videos:
+        first_by_id.setdefault(vid.video_id, vid)
+    unique = list(first_by_id.values())
+
+    created_ids = []
+    for i in range(0, len(unique), BATCH_CHUNK_ROWS):
+        rows = [vid.model_dump(mode="json") for vid in unique[i:i + BATCH_CHUNK_ROWS]]
+        stmt = (
+            pg_insert(Video)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Video.video_id])
+            .returning(Video.video_id)
+        )
+        result = await db.execute(stmt)
+        created = result.scalars().all()
+        created_set = set(created)
+        await upsert_transcripts(db, [(r["video_id"], r["transcript_json"]) for r in rows if r["video_id"] in created_set])
+        created_ids.extend(created)
+    await refresh_search_vectors(db, created_ids)
+    return created_ids
+
+def batch_report(submitted_ids: List[str], created_ids: List[str], **extra) -> dict:
+    created_set = set(created_ids)
+    ignored_ids = [vid for vid in dict.fromkeys(submitted_ids) if vid not in created_set]
+    return {
+        "status": "success",
+        "created": len(created_ids),
+        "ignored": len(ignored_ids),
+        "created_ids": created_ids,
+        "ignored_ids": ignored_ids,
+        **extra,
+    }
+
 @router.post("/batch/", response_model=dict,
     dependencies=[
         Depends(RateLimiter(times=5, seconds=60)),
@@ -154,19 +447,90 @@ async def read_video(video_id: str, db: AsyncSession = Depends(get_db)):
     ])
 async def create_videos_batch(videos: List[VideoCreate], db: AsyncSession = Depends(get_db)):
     """
-    🔒 PRIVADO: Carga masiva.
+    🔒 PRIVADO: Carga masiva. Los IDs que ya existen se ignoran y se informan.
     """
-    if len(videos) > 50: raise HTTPException(400, "Límite: 50 videos por batch")
-    created, ignored = 0, 0
-    for vid in videos:
-        res = await db.execute(select(Video).where(Video.video_id == vid.video_id))
-        if res.scalar_one_or_none():
-            ignored += 1
-            continue
-        db.add(Video(**vid.model_dump()))
-        created += 1
+    if len(videos) > BATCH_MAX_VIDEOS:
+        raise HTTPException(400, f"Límite: {BATCH_MAX_VIDEOS} videos por batch (usa /batch/ndjson)")
+    created_ids = await insert_videos_ignoring_existing(db, videos)
     await db.commit()
-    return {"status": "success", "created": created, "ignored": ignored}
+    await cache.invalidate_videos(created_ids)
+    return batch_report([vid.video_id for vid in videos], created_ids)
+
+
+@router.post("/batch/ndjson", response_model=dict,
+    dependencies=[
+        Depends(RateLimiter(times=5, seconds=60)),
+        Depends(verify_admin_key) # <--- CANDADO 🔒
+    ])
+async def create_videos_ndjson(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    🔒 PRIVADO: Carga masiva en streaming. Cuerpo NDJSON (un VideoCreate por
+    línea, application/x-ndjson). Se lee y se inserta por trozos, así que la
+    memoria no depende del tamaño total. Cada trozo se confirma por separado;
+    las líneas inválidas se saltan y se informan.
+
+    El informe trae los totales y solo los primeros NDJSON_MAX_IDS IDs
+    creados/ignorados y NDJSON_MAX_ERRORS errores (`truncated` lo indica).
+    """
+    report = {"created": 0, "ignored": 0, "created_ids": [], "ignored_ids": []}
+    errors = []
+    pending: List[VideoCreate] = []
+    invalid = 0
+    line_no = 0
+
+    def keep_ids(kind: str, ids: List[str]):
+        report[kind] += len(ids)
+        sample = report[f"{kind}_ids"]
+        sample.extend(ids[:NDJSON_MAX_IDS - len(sample)])
+
+    async def flush():
+        ids = await insert_videos_ignoring_existing(db, pending)
+        await db.commit()
+        await cache.invalidate_videos(ids)
+        created = set(ids)
+        keep_ids("created", ids)
+        keep_ids("ignored", [vid for vid in dict.fromkeys(v.video_id for v in pending) if vid not in created])
+        pending.clear()
+
+    def handle_line(raw: bytes):
+        nonlocal invalid
+        if not raw.strip():
+            return
+        try:
+            vid = VideoCreate.model_validate_json(raw)
+        except Exception as e:
+            invalid += 1
+            if len(errors) < NDJSON_MAX_ERRORS:
+                errors.append({"line": line_no, "error": str(e)[:300]})
+            return
+        pending.append(vid)
+
+    # Buffer mutable: se añade cada trozo y solo se busca "\n" en lo nuevo,
+    # así una línea larga repartida en muchos trozos no se recopia ni se
+    # vuelve a recorrer entera con cada uno.
+    buffer = bytearray()
+    async for chunk in request.stream():
+        scan_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", scan_from)) != -1:
+            line_no += 1
+            handle_line(bytes(buffer[start:end]))
+            start = scan_from = end + 1
+            if len(pending) >= BATCH_CHUNK_ROWS:
+                await flush()
+        del buffer[:start]
+        if len(buffer) > NDJSON_MAX_LINE_BYTES:
+            raise HTTPException(413, f"Línea {line_no + 1} supera {NDJSON_MAX_LINE_BYTES} bytes")
+    line_no += 1
+    handle_line(bytes(buffer))
+    if pending:
+        await flush()
+
+    truncated = (report["created"] > len(report["created_ids"])
+                 or report["ignored"] > len(report["ignored_ids"])
+                 or invalid > len(errors))
+    return {"status": "success", **report, "invalid": invalid, "errors": errors, "truncated": truncated}
 
 
 # --- CREATE VIDEO (MANUAL) ---
@@ -180,7 +544,11 @@ async def create_video(video: VideoCreate, db: AsyncSession = Depends(get_db)):
 
     new_video = Video(**video.model_dump())
     db.add(new_video)
+    await db.flush()
+    await upsert_transcripts(db, [(new_video.video_id, video.transcript_json)])
+    await refresh_search_vectors(db, [new_video.video_id])
     await db.commit()
+    await cache.invalidate_videos([new_video.video_id])
     await db.refresh(new_video)
     return new_video
 
@@ -194,10 +562,16 @@ async def update_video(video_id: str, video_update: VideoUpdate, db: AsyncSessio
     db_video = res.scalar_one_or_none()
     if not db_video: raise HTTPException(404, "Video no encontrado")
     
-    for key, value in video_update.model_dump(exclude_unset=True).items():
+    changes = video_update.model_dump(exclude_unset=True)
+    for key, value in changes.items():
         setattr(db_video, key, value)
     
+    await db.flush()
+    if "transcript_json" in changes:
+        await upsert_transcripts(db, [(video_id, changes["transcript_json"])])
+    await refresh_search_vectors(db, [video_id])
     await db.commit()
+    await cache.invalidate_videos([video_id])
     await db.refresh(db_video)
     return db_video
 
@@ -214,4 +588,5 @@ async def delete_video(video_id: str, db: AsyncSession = Depends(get_db)):
     
     await db.delete(db_video)
     await db.commit()
+    await cache.invalidate_videos([video_id])
     return {"message": "Eliminado"}
\ No newline at end of file
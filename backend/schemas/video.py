@@ -35,6 +35,7 @@ class VideoBase(BaseModel):
     subtitle_source: SubSourceEnum = SubSourceEnum.none
 
     # Datos Ricos (JSON)
+    rate_profile: Optional[Dict[str, Any]] = None  # Velocidad por tramos del video
     # transcript: Se omite o se pone Optional porque ya no lo usamos en texto plano
     transcript_json: List[Dict[str, Any]] = [] # <--- Crucial para el player interactivo
     ai_analysis: Dict[str, Any] = {}           # <--- Aquí va vocabulario, grammar, summary
@@ -52,6 +53,30 @@ class VideoUpdate(BaseModel):
     level: Optional[CefrEnum] = None
     ai_analysis: Optional[Dict[str, Any]] = None
 
+# --- SUMMARY (Tarjetas del Home) ---
+# Sin transcript_json ni ai_analysis: es lo único que pintan las tarjetas.
+class VideoSummary(BaseModel):
+    video_id: str
+    url: str
+    title: str
+    channel_name: Optional[str] = None
+    topics: List[str] = []
+    accents: List[str] = []
+    content_types: List[str] = []
+    level: Optional[CefrEnum] = None
+    wpm: int = 0
+    language: str = "en"
+    subtitle_source: SubSourceEnum = SubSourceEnum.none
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+# --- SEARCH ---
+class VideoSearchResult(VideoSummary):
+    rank: float
+
 # --- RESPONSE ---
 class VideoResponse(VideoBase):
     video_id: str
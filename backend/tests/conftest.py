@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Los módulos se importan desde la raíz del backend (from functions.X import ...)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# database.py exige estas variables al importarse; los tests no abren conexiones
+os.environ.setdefault("POSTGRESQL_PASSWORD", "test")
+os.environ.setdefault("DB_NAME", "test")
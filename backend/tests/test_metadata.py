@@ -0,0 +1,122 @@
+"""
+Ruta HTTP de transcripciones (functions/Metadata.py) contra las grabaciones
+de Data/fixtures/transcripts, y orden de respaldo HTTP -> navegador.
+"""
+import os
+
+import pytest
+
+from functions.Metadata import (
+    TranscriptSource,
+    VideoMetadataExtractor,
+    fixture_http_source,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "Data", "fixtures", "transcripts")
+MANUAL_ID = "-NNCca97v98"        # Subtítulos manuales en json3
+TRANSLATED_ID = "-uuT8HW4KPM"    # Solo una traducción automática (tlang=en)
+
+
+def watch_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class FakeBrowserPool:
+    def close(self):
+        pass
+
+
+class RecordingSource(TranscriptSource):
+    """Fuente falsa que anota las llamadas y responde lo configurado."""
+
+    def __init__(self, extractor, name, calls, result=None, error=None):
+        super().__init__(extractor)
+        self.name = name
+        self.calls = calls
+        self.result = result
+        self.error = error
+
+    def fetch(self, url):
+        self.calls.append(self.name)
+        if self.error:
+            raise self.error
+        return dict(self.result) if self.result else None
+
+
+@pytest.fixture
+def extractor():
+    return VideoMetadataExtractor(browser_pool=FakeBrowserPool())
+
+
+def test_transcript_source_is_abstract(extractor):
+    with pytest.raises(TypeError):
+        TranscriptSource(extractor)
+
+
+def test_http_fixture_manual_track(extractor):
+    result = fixture_http_source(extractor, FIXTURES_DIR).fetch(watch_url(MANUAL_ID))
+
+    assert result["video_id"] == MANUAL_ID
+    assert result["subtitle_source"] == "manual"
+    segments = result["transcript_json"]
+    assert segments
+    for seg in segments:
+        assert set(seg) == {"start", "text"}
+        assert isinstance(seg["start"], int)
+        assert seg["text"] and seg["text"] == seg["text"].strip()
+        # Sin anotaciones tipo [Music] ni saltos de línea
+        assert "[" not in seg["text"] and "\n" not in seg["text"]
+    assert segments[0] == {"start": 2, "text": "- Game console reviews are funny"}
+    assert result["transcript_full"] == " ".join(seg["text"] for seg in segments)
+
+
+def test_http_fixture_rejects_translated_track(extractor):
+    source = fixture_http_source(extractor, FIXTURES_DIR)
+    assert source.fetch(watch_url(TRANSLATED_ID)) is None
+
+
+def test_fetch_sync_records_transcript_path(extractor):
+    extractor.sources = [fixture_http_source(extractor, FIXTURES_DIR)]
+    result = extractor._fetch_sync(watch_url(MANUAL_ID))
+
+    assert result["transcript_path"] == "http"
+    assert extractor.source_stats == {"http": 1}
+
+
+def test_fetch_sync_falls_back_to_browser(extractor):
+    calls = []
+    browser = RecordingSource(extractor, "browser", calls, result={"video_id": TRANSLATED_ID})
+    http = fixture_http_source(extractor, FIXTURES_DIR)
+    http_fetch = http.fetch
+    http.fetch = lambda url: calls.append("http") or http_fetch(url)
+    extractor.sources = [http, browser]
+
+    result = extractor._fetch_sync(watch_url(TRANSLATED_ID))
+
+    assert calls == ["http", "browser"]
+    assert result["transcript_path"] == "browser"
+    assert extractor.source_stats == {"browser": 1}
+
+
+def test_fetch_sync_stops_at_first_source_with_data(extractor):
+    calls = []
+    extractor.sources = [
+        RecordingSource(extractor, "http", calls, result={"video_id": MANUAL_ID}),
+        RecordingSource(extractor, "browser", calls, result={"video_id": MANUAL_ID}),
+    ]
+
+    assert extractor._fetch_sync(watch_url(MANUAL_ID))["transcript_path"] == "http"
+    assert calls == ["http"]
+
+
+def test_fetch_sync_survives_source_errors(extractor):
+    calls = []
+    extractor.sources = [
+        RecordingSource(extractor, "http", calls, error=RuntimeError("HTTP 429")),
+        RecordingSource(extractor, "browser", calls),
+    ]
+
+    assert extractor._fetch_sync(watch_url(MANUAL_ID)) is None
+    assert calls == ["http", "browser"]
+    assert extractor.source_stats == {"failed": 1}
@@ -0,0 +1,87 @@
+"""
+Alta en lote (routers/videos.py): IDs repetidos en una misma carga no deben
+llegar dos veces al INSERT ni al upsert de video_transcripts.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from routers import videos as videos_router
+from schemas.video import VideoCreate
+
+
+class FakeResult:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.ids
+
+
+class FakeSession:
+    """Emula INSERT ... ON CONFLICT DO NOTHING RETURNING video_id sobre un set de IDs."""
+
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.inserted_batches = []
+
+    async def execute(self, stmt):
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        ids = [params[f"video_id_m{i}"] for i in range(len(params)) if f"video_id_m{i}" in params]
+        self.inserted_batches.append(ids)
+        created = []
+        for vid in ids:
+            if vid not in self.existing:
+                self.existing.add(vid)
+                created.append(vid)
+        return FakeResult(created)
+
+
+def make_video(video_id, text):
+    return VideoCreate(video_id=video_id, url=f"https://www.youtube.com/watch?v={video_id}",
+                       title=video_id, transcript_json=[{"start": 0, "text": text}])
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    calls = {"transcripts": [], "search": []}
+
+    async def fake_upsert_transcripts(session, items):
+        calls["transcripts"].append(list(items))
+
+    async def fake_refresh_search_vectors(session, ids):
+        calls["search"].append(list(ids))
+
+    monkeypatch.setattr(videos_router, "upsert_transcripts", fake_upsert_transcripts)
+    monkeypatch.setattr(videos_router, "refresh_search_vectors", fake_refresh_search_vectors)
+    return calls
+
+
+def test_batch_with_duplicate_id_keeps_first_row(captured):
+    session = FakeSession()
+    batch = [make_video("aaa", "first"), make_video("bbb", "other"), make_video("aaa", "second")]
+
+    created = asyncio.run(videos_router.insert_videos_ignoring_existing(session, batch))
+
+    assert created == ["aaa", "bbb"]
+    assert session.inserted_batches == [["aaa", "bbb"]]
+    (items,) = captured["transcripts"]
+    assert [vid for vid, _ in items] == ["aaa", "bbb"]
+    assert dict(items)["aaa"] == [{"start": 0, "text": "first"}]
+    assert captured["search"] == [["aaa", "bbb"]]
+
+
+def test_batch_skips_transcripts_of_existing_videos(captured):
+    session = FakeSession(existing={"aaa"})
+    batch = [make_video("aaa", "old"), make_video("ccc", "new"), make_video("ccc", "dup")]
+
+    created = asyncio.run(videos_router.insert_videos_ignoring_existing(session, batch))
+
+    assert created == ["ccc"]
+    assert captured["transcripts"] == [[("ccc", [{"start": 0, "text": "new"}])]]
+    report = videos_router.batch_report([v.video_id for v in batch], created)
+    assert report["created"] == 1 and report["ignored_ids"] == ["aaa"]
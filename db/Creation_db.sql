@@ -1,4 +1,5 @@
 --Data base created in postgresql
+DROP TABLE IF EXISTS video_transcripts;
 DROP TABLE IF EXISTS videos;
 DROP TYPE IF EXISTS cefr_enum;
 DROP TYPE IF EXISTS sub_source_enum;
@@ -23,8 +24,80 @@ CREATE TABLE videos (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+--Columnas que usa el backend (models/video.py) y que la tabla original no tenía
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS language TEXT DEFAULT 'en';
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS transcript TEXT;
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS transcript_json JSONB DEFAULT '[]';
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ;
+
+--created_at obligatorio: lo usan el cursor del listado y los esquemas de respuesta
+UPDATE videos SET created_at = NOW() WHERE created_at IS NULL;
+ALTER TABLE videos ALTER COLUMN created_at SET NOT NULL;
+
 --Creamos los índices para que las búsquedas sean instantáneas
 CREATE INDEX idx_topics ON videos USING GIN (topics);
 CREATE INDEX idx_accents ON videos USING GIN (accents);
 CREATE INDEX idx_types ON videos USING GIN (content_types);
-CREATE INDEX idx_level_wpm ON videos (level, wpm);
\ No newline at end of file
+CREATE INDEX idx_level_wpm ON videos (level, wpm);
+
+--Paginación por cursor (keyset) de GET /videos/
+CREATE INDEX IF NOT EXISTS idx_created_video ON videos (created_at, video_id);
+
+--Búsqueda de texto completo: título (A), vocabulario IA (B) y transcripción (C)
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS search_vector tsvector;
+CREATE INDEX IF NOT EXISTS idx_search_vector ON videos USING GIN (search_vector);
+
+UPDATE videos SET search_vector =
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(jsonb_path_query_array(ai_analysis::jsonb, '$.vocabulary[*].term'), '[]'::jsonb)), 'B') ||
+    setweight(to_tsvector('simple', coalesce(jsonb_path_query_array(transcript_json::jsonb, '$[*].text'), '[]'::jsonb)), 'C');
+
+--Trigramas para el filtro ?title= (ILIKE '%...%') del listado
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_title_trgm ON videos USING GIN (title gin_trgm_ops);
+
+--Estado de rastreo incremental por playlist (functions/Crawl.py)
+CREATE TABLE IF NOT EXISTS playlist_state (
+    playlist_url TEXT PRIMARY KEY,
+    known_ids TEXT[] DEFAULT '{}',
+    head_ids TEXT[] DEFAULT '{}',
+    last_position INTEGER DEFAULT 0,
+    total_count INTEGER,
+    last_seen_at TIMESTAMPTZ,
+    last_changed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+--Cola duradera de trabajos por video (functions/Jobs.py). Varios procesos
+--reclaman con FOR UPDATE SKIP LOCKED y un lease que caduca si el proceso muere.
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    video_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    playlist_url TEXT,
+    status VARCHAR(16) NOT NULL DEFAULT 'queued', -- queued | claimed | scraping | analyzing | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ DEFAULT NOW(),    -- NULL = fallo definitivo
+    lease_owner TEXT,
+    lease_expires TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON crawl_jobs (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_playlist ON crawl_jobs (playlist_url, status);
+
+--Perfil de velocidad de habla (lo rellenan el pipeline y recompute_rates.py)
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS rate_profile JSONB;
+
+--Transcripción compacta: inicios (deltas en ms) y textos en blobs zlib
+--(functions/Transcripts.py). La rellenan el pipeline y backfill_transcripts.py.
+--Es una copia de transcript_json para el reproductor: el almacenamiento total crece.
+CREATE TABLE IF NOT EXISTS video_transcripts (
+    video_id TEXT PRIMARY KEY REFERENCES videos (video_id) ON DELETE CASCADE,
+    encoding SMALLINT NOT NULL DEFAULT 1,
+    segment_count INTEGER NOT NULL DEFAULT 0,
+    end_ms INTEGER NOT NULL DEFAULT 0,
+    starts BYTEA NOT NULL,
+    texts BYTEA NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);